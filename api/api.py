@@ -18,22 +18,53 @@ from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 from pathlib import Path
-from typing import List, Union, Optional, Generator
+from typing import List, Union, Optional, Generator, NamedTuple, Tuple
 import mysql.connector
-from mysql.connector.pooling import MySQLConnectionPool
+from mysql.connector.constants import FieldType
 import datetime
 import os
 import re
 import io
 import uuid
 import json
-import decimal
+import weakref
+import base64
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cachetools import LRUCache
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pydantic import BaseModel
 
 from flask import Flask
 from flask_cors import CORS
 
+from columnar_analytics import (
+    ColumnarEngine,
+    ColumnarEngineError,
+    build_columnar_query,
+    get_arrow_schema,
+)
+from compression import (
+    COMPRESSIBLE_MIMETYPES,
+    choose_encoding,
+    compress_body,
+    compress_stream,
+)
+from connection_pool import InstrumentedConnectionPool, ReplicaRouter
 from geospatial_context import process_geospatial_message
+from json_provider import FastJSONProvider
+from sql_constants import SQLConstants
+from response_cache import (
+    CachedResponse,
+    build_cache_key,
+    cache_streamed_response,
+    create_response_cache,
+)
+from vector_tiles import encode_point_layer, encode_tile, is_valid_tile, tile_bounds
+from zipcode_boundaries import build_feature_collection, build_zipcode_features, zoom_band
 
 # Load environment variables
 load_dotenv()
@@ -61,6 +92,89 @@ class Config:
     FLASK_SESSION_COOKIE_SECURE = (
         os.getenv("FLASK_SESSION_COOKIE_SECURE", "False").lower() == "true"
     )
+    # Keep session state when connections return to the pool so prepared statements can be reused
+    DB_POOL_RESET_SESSION = (
+        os.getenv("DB_POOL_RESET_SESSION", "False").lower() == "true"
+    )
+    # Connection pool: connections (at most 32), requests allowed to queue for one, seconds they wait,
+    # and age in seconds after which a connection is reconnected
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_POOL_MAX_WAITERS = int(os.getenv("DB_POOL_MAX_WAITERS", "32"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))
+    # Read replicas for analytical reads, as comma-separated host[:port] entries (empty to read from the primary),
+    # and seconds a replica that failed to connect is skipped
+    DB_REPLICA_HOSTS = [
+        host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()
+    ]
+    DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "30"))
+    # Compress responses for clients that accept gzip or brotli; buffered responses smaller than the minimum are sent as-is
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    # Number of rows fetched from MySQL and encoded per streamed chunk
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+    # Seconds the ingest data version is cached before it is re-read from the database
+    DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "60"))
+    # Vector tiles: total size of the encoded tiles kept in memory, points per tile and client cache lifetime
+    TILE_CACHE_MAX_BYTES = int(os.getenv("TILE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    TILE_MAX_FEATURES = int(os.getenv("TILE_MAX_FEATURES", "50000"))
+    TILE_MAX_AGE = int(os.getenv("TILE_MAX_AGE", "3600"))
+    # Zipcode boundaries: number of compressed zipcode sets kept in memory and client cache lifetime
+    ZIP_GEO_CACHE_SIZE = int(os.getenv("ZIP_GEO_CACHE_SIZE", "256"))
+    ZIP_GEO_MAX_AGE = int(os.getenv("ZIP_GEO_MAX_AGE", "86400"))
+    # /data/query response cache: "memory", "disk" or "none", total size, largest cached response and disk location
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = int(
+        os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(32 * 1024 * 1024))
+    )
+    RESPONSE_CACHE_PATH = BASE_DIR / Path(
+        os.getenv("RESPONSE_CACHE_PATH", "./response_cache").lstrip("./")
+    )
+    # Largest page a client can request with limit=
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "10000"))
+    # MAX_EXECUTION_TIME for /data/query, tile and context queries in milliseconds, 0 for no limit.
+    # QUERY_TIMEOUTS_MS overrides it per request type, e.g. "311_summary_context=120000,311_by_geo=0"
+    QUERY_TIMEOUT_MS = int(os.getenv("QUERY_TIMEOUT_MS", "30000"))
+    QUERY_TIMEOUTS_MS = {
+        name.strip(): int(value)
+        for name, value in (
+            item.split("=", 1)
+            for item in os.getenv(
+                "QUERY_TIMEOUTS_MS",
+                "311_summary_context=120000,311_by_geo=0,911_shots_fired=0",
+            ).split(",")
+            if item.strip()
+        )
+    }
+    # Most event_ids accepted by a 311_summary request
+    MAX_EVENT_IDS = int(os.getenv("MAX_EVENT_IDS", "50000"))
+    # /data/query/batch: most requests per batch and requests run at once, each on its own pooled connection
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "10"))
+    BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+    # Answer aggregate requests from Parquet snapshots with DuckDB (see columnar_analytics.py and data_maintenance.py)
+    COLUMNAR_ENGINE_ENABLED = (
+        os.getenv("COLUMNAR_ENGINE_ENABLED", "False").lower() == "true"
+    )
+    COLUMNAR_SNAPSHOT_PATH = BASE_DIR / Path(
+        os.getenv("COLUMNAR_SNAPSHOT_PATH", "./snapshots").lstrip("./")
+    )
+    COLUMNAR_REQUESTS = [
+        data_request.strip()
+        for data_request in os.getenv(
+            "COLUMNAR_REQUESTS",
+            "311_summary,311_summary_context,311_timeseries,911_timeseries",
+        ).split(",")
+        if data_request.strip()
+    ]
+    # Answer 311_summary requests from the pre-aggregated monthly rollup (see data_maintenance.py)
+    BOS311_ROLLUP_ENABLED = (
+        os.getenv("BOS311_ROLLUP_ENABLED", "True").lower() == "true"
+    )
+    # Answer 911_homicides_and_shots_fired from the precomputed link table (see data_maintenance.py)
+    HOMICIDE_SHOTS_LINK_ENABLED = (
+        os.getenv("HOMICIDE_SHOTS_LINK_ENABLED", "True").lower() == "true"
+    )
 
     # Database configuration
     DB_CONFIG = {
@@ -68,17 +182,84 @@ class Config:
         "user": os.getenv("DB_USER"),
         "password": os.getenv("DB_PASSWORD"),
         "database": os.getenv("DB_NAME"),
+        # The pure Python driver does its I/O through sockets, which gevent makes cooperative (see gevent_api.py)
+        "use_pure": os.getenv("DB_USE_PURE", "False").lower() == "true",
     }
 
 
 # Initialize GenAI client
 genai_client = genai.Client(api_key=Config.GEMINI_API_KEY)
 
+# Server-side prepared statements, cached per physical connection and SQL template.
+# Dropped when the pool recycles a connection, since they are bound to its old client handle
+prepared_statements = weakref.WeakKeyDictionary()
+
 # Create connection pool
-db_pool = MySQLConnectionPool(**Config.DB_CONFIG)
+db_pool = InstrumentedConnectionPool(
+    pool_size=Config.DB_POOL_SIZE,
+    max_waiters=Config.DB_POOL_MAX_WAITERS,
+    timeout=Config.DB_POOL_TIMEOUT,
+    recycle_after=Config.DB_POOL_RECYCLE,
+    on_reconnect=lambda raw_conn: prepared_statements.pop(raw_conn, None),
+    pool_reset_session=Config.DB_POOL_RESET_SESSION,
+    **Config.DB_CONFIG,
+)
+
+
+def replica_pool_factory(replica: str):
+    """
+    Build a function that creates the connection pool for a read replica.
+
+    Args:
+        replica (str): The replica as host or host:port.
+
+    Returns:
+        Callable[[], InstrumentedConnectionPool]: Creates the replica's pool on first use.
+    """
+    host, _, port = replica.partition(":")
+    replica_config = {**Config.DB_CONFIG, "host": host}
+    if port:
+        replica_config["port"] = int(port)
+
+    return lambda: InstrumentedConnectionPool(
+        pool_size=Config.DB_POOL_SIZE,
+        max_waiters=Config.DB_POOL_MAX_WAITERS,
+        timeout=Config.DB_POOL_TIMEOUT,
+        recycle_after=Config.DB_POOL_RECYCLE,
+        on_reconnect=lambda raw_conn: prepared_statements.pop(raw_conn, None),
+        pool_reset_session=Config.DB_POOL_RESET_SESSION,
+        **replica_config,
+    )
+
+
+# Route read-only queries to the read replicas, if any are configured
+replica_router = (
+    ReplicaRouter(
+        {replica: replica_pool_factory(replica) for replica in Config.DB_REPLICA_HOSTS},
+        retry_after=Config.DB_REPLICA_RETRY_AFTER,
+    )
+    if Config.DB_REPLICA_HOSTS
+    else None
+)
+
+# Answer aggregate requests from the Parquet snapshots, if enabled
+columnar_engine = (
+    ColumnarEngine(Config.COLUMNAR_SNAPSHOT_PATH)
+    if Config.COLUMNAR_ENGINE_ENABLED
+    else None
+)
+
+# Create /data/query response cache
+response_cache = create_response_cache(
+    backend=Config.RESPONSE_CACHE_BACKEND,
+    max_bytes=Config.RESPONSE_CACHE_MAX_BYTES,
+    max_entry_bytes=Config.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    path=Config.RESPONSE_CACHE_PATH,
+)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config.update(
     SECRET_KEY=Config.FLASK_SECRET_KEY,
     PERMANENT_SESSION_LIFETIME=datetime.timedelta(days=7),
@@ -91,7 +272,7 @@ app.config.update(
 CORS(
     app,
     supports_credentials=True,
-    expose_headers=["RethinkAI-API-Key"],
+    expose_headers=["RethinkAI-API-Key", "ETag", "X-Next-Cursor", "X-Watermark"],
     resources={r"/*": {"origins": "*"}},
     allow_headers=["Content-Type", "RethinkAI-API-Key"],
 )
@@ -118,107 +299,56 @@ class Structured_Data(BaseModel):
 
 
 #
-# SQL Query Constants
+# Parameterized SQL query returned by the query builders
 #
-class SQLConstants:
-    # TNT neighborhood coordinates. Using less specific rectangular shape for now.
-    # Format: "lng_bottom_left lat_bottom_left, lng_top_left lat_top_left, lng_top_right lat_top_right, lng_bottom_right lat_bottom_right, lng_bottom_left lat_bottom_left"
-    DEFAULT_POLYGON_COORDINATES = "-71.081297 42.284182, -71.081784 42.293107, -71.071730 42.293255, -71.071601 42.284301, -71.081297 42.284182"
-
-    # 311 category mappings
-    CATEGORY_TYPES = {
-        "living_conditions": "'Poor Conditions of Property', 'Needle Pickup', 'Unsatisfactory Living Conditions', 'Rodent Activity', 'Unsafe Dangerous Conditions', 'Pest Infestation - Residential'",
-        "trash": "'Missed Trash/Recycling/Yard Waste/Bulk Item', 'Illegal Dumping'",
-        "streets": "'Requests for Street Cleaning', 'Request for Pothole Repair', 'Unshoveled Sidewalk', 'Tree Maintenance Requests', 'Sidewalk Repair (Make Safe)', 'Street Light Outages', 'Sign Repair'",
-        "parking": "'Parking Enforcement', 'Space Savers', 'Parking on Front/Back Yards (Illegal Parking)', 'Municipal Parking Lot Complaints', 'Private Parking Lot Complaints'",
-    }
+class SQLQuery(NamedTuple):
+    sql: str
+    params: tuple = ()
+    # MAX_EXECUTION_TIME applied when the query is executed, in milliseconds (0 for no limit)
+    timeout_ms: int = 0
+    # "mysql", or "duckdb" for queries answered by the columnar engine from the Parquet snapshots
+    engine: str = "mysql"
 
-    # Set the 'all' category to include all individual categories
-    CATEGORY_TYPES["all"] = ", ".join(
-        [cat for cat in ", ".join(CATEGORY_TYPES.values()).split(", ")]
-    )
 
-    BOS311_NORMALIZED_TYPE_CASE = f"""
-    CASE
-        WHEN type IN ({CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-        WHEN type IN ({CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-        WHEN type IN ({CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-        WHEN type IN ({CATEGORY_TYPES['parking']}) THEN 'Parking'
-    END AS normalized_type,
-    """
-    # Common aggregation columns for monthly/quarterly breakdowns
-    BOS911_TIME_BREAKDOWN = """
-    COUNT(*) AS total_by_year,
-    SUM(CASE WHEN quarter = 1 THEN 1 ELSE 0 END) AS q1_total,
-    SUM(CASE WHEN quarter = 2 THEN 1 ELSE 0 END) AS q2_total,
-    SUM(CASE WHEN quarter = 3 THEN 1 ELSE 0 END) AS q3_total,
-    SUM(CASE WHEN quarter = 4 THEN 1 ELSE 0 END) AS q4_total,
-    SUM(CASE WHEN month = 1 THEN 1 ELSE 0 END) AS jan_total,
-    SUM(CASE WHEN month = 2 THEN 1 ELSE 0 END) AS feb_total,
-    SUM(CASE WHEN month = 3 THEN 1 ELSE 0 END) AS mar_total,
-    SUM(CASE WHEN month = 4 THEN 1 ELSE 0 END) AS apr_total,
-    SUM(CASE WHEN month = 5 THEN 1 ELSE 0 END) AS may_total,
-    SUM(CASE WHEN month = 6 THEN 1 ELSE 0 END) AS jun_total,
-    SUM(CASE WHEN month = 7 THEN 1 ELSE 0 END) AS jul_total,
-    SUM(CASE WHEN month = 8 THEN 1 ELSE 0 END) AS aug_total,
-    SUM(CASE WHEN month = 9 THEN 1 ELSE 0 END) AS sep_total,
-    SUM(CASE WHEN month = 10 THEN 1 ELSE 0 END) AS oct_total,
-    SUM(CASE WHEN month = 11 THEN 1 ELSE 0 END) AS nov_total,
-    SUM(CASE WHEN month = 12 THEN 1 ELSE 0 END) AS dec_total
-    """
-
-    BOS311_TIME_BREAKDOWN = """
-    COUNT(*) AS total_by_year,
-    SUM(CASE WHEN QUARTER(open_dt) = 1 THEN 1 ELSE 0 END) AS q1_total,
-    SUM(CASE WHEN QUARTER(open_dt) = 2 THEN 1 ELSE 0 END) AS q2_total,
-    SUM(CASE WHEN QUARTER(open_dt) = 3 THEN 1 ELSE 0 END) AS q3_total,
-    SUM(CASE WHEN QUARTER(open_dt) = 4 THEN 1 ELSE 0 END) AS q4_total,
-    SUM(CASE WHEN MONTH(open_dt) = 1 THEN 1 ELSE 0 END) AS jan_total,
-    SUM(CASE WHEN MONTH(open_dt) = 2 THEN 1 ELSE 0 END) AS feb_total,
-    SUM(CASE WHEN MONTH(open_dt) = 3 THEN 1 ELSE 0 END) AS mar_total,
-    SUM(CASE WHEN MONTH(open_dt) = 4 THEN 1 ELSE 0 END) AS apr_total,
-    SUM(CASE WHEN MONTH(open_dt) = 5 THEN 1 ELSE 0 END) AS may_total,
-    SUM(CASE WHEN MONTH(open_dt) = 6 THEN 1 ELSE 0 END) AS jun_total,
-    SUM(CASE WHEN MONTH(open_dt) = 7 THEN 1 ELSE 0 END) AS jul_total,
-    SUM(CASE WHEN MONTH(open_dt) = 8 THEN 1 ELSE 0 END) AS aug_total,
-    SUM(CASE WHEN MONTH(open_dt) = 9 THEN 1 ELSE 0 END) AS sep_total,
-    SUM(CASE WHEN MONTH(open_dt) = 10 THEN 1 ELSE 0 END) AS oct_total,
-    SUM(CASE WHEN MONTH(open_dt) = 11 THEN 1 ELSE 0 END) AS nov_total,
-    SUM(CASE WHEN MONTH(open_dt) = 12 THEN 1 ELSE 0 END) AS dec_total
-    """
-
-    ##### 311 specific constants #####
-
-    # Base WHERE clause for 311 queries, not using neighborhood coordinates
-    # This is a simplified version that provides backward compatibility
-    BOS311_BASE_WHERE = (
-        "police_district IN ('B2', 'B3', 'C11') AND neighborhood = 'Dorchester'"
-    )
+class QueryTimeoutError(mysql.connector.errors.DatabaseError):
+    """Raised when MySQL stops a query because it ran past its MAX_EXECUTION_TIME limit."""
 
-    # Spatial WHERE clause for 311 queries, using neighborhood coordinates
-    # Uses a polygon that covers the TNT area
-    BOS311_SPATIAL_WHERE = f"""
-    ST_Contains(
-        ST_GeomFromText('POLYGON(({DEFAULT_POLYGON_COORDINATES}))'),
-        coordinates
-    ) = 1
-    """
 
-    ##### 911 specific constants #####
+#
+# Response mimetype and extra headers for each /data/query output_type
+#
+OUTPUT_TYPE_RESPONSES = {
+    "json": ("application/json", {}),
+    "stream": ("application/json", {}),
+    "csv": ("text/csv", {"Content-Disposition": "attachment; filename=export.csv"}),
+    "arrow": ("application/vnd.apache.arrow.stream", {}),
+    "parquet": (
+        "application/vnd.apache.parquet",
+        {"Content-Disposition": "attachment; filename=export.parquet"},
+    ),
+}
 
-    # Base WHERE clause for 911 queries, not using neighborhood coordinates
-    # This is a simplified version that provides backward compatibility
-    BOS911_BASE_WHERE = "district IN ('B2', 'B3', 'C11') AND neighborhood = 'Dorchester' AND year >= 2018 AND year < 2025"
 
-    # Spatial WHERE clause for 911 queries, using neighborhood coordinates
-    # Uses a polygon that covers the TNT area
-    BOS911_SPATIAL_WHERE = f"""
-    year >= 2018 AND year < 2025
-    AND ST_Contains(
-        ST_GeomFromText('POLYGON(({DEFAULT_POLYGON_COORDINATES}))'),
-        coordinates
-    ) = 1
-    """
+#
+# Requests that support keyset pagination with after_id/cursor and limit
+#
+PAGINATED_REQUESTS = ("311_by_geo", "911_shots_fired")
+
+# Paginated requests whose table has an integer primary key, 911_shots_fired ids are incident number strings
+NUMERIC_ID_REQUESTS = ("311_by_geo",)
+
+
+#
+# Requests that support since= delta queries and return an X-Watermark header
+#
+DELTA_REQUESTS = ("311_by_geo", "911_shots_fired")
+
+
+#
+# Geohash lengths accepted by 311_grid and 911_grid, from about 39 km down to about 5 m cells
+#
+GRID_RESOLUTIONS = range(4, 10)
+DEFAULT_GRID_RESOLUTION = 7
 
 
 #
@@ -231,10 +361,16 @@ def build_311_query(
     request_zipcode: str = "",
     event_ids: str = "",
     is_spatial=False,
-) -> str:
+    after_id: str = "",
+    limit: int = 0,
+    bucket: str = "",
+    resolution: int = 0,
+    since: Optional[datetime.datetime] = None,
+) -> Optional[SQLQuery]:
     
     """
     Build SQL query for 311 data based on the request type and parameters.
+    User-supplied values are returned as bound parameters so each request type maps to a fixed SQL template.
 
     Args:
         data_request (str): The type of data request (e.g., "311_by_geo", "311_summary_context", "311_summary").
@@ -243,12 +379,17 @@ def build_311_query(
         request_zipcode (str, optional): Zipcode for filtering results.
         event_ids (str, optional): Comma-separated list of event IDs for specific queries.
         is_spatial (bool, optional): Whether to use spatial queries based on coordinates.
+        after_id (str, optional): Only return rows with an id greater than this (311_by_geo only).
+        limit (int, optional): Page size; when set, rows are ordered by id (311_by_geo only).
+        bucket (str, optional): Time series bucket, a key of SQLConstants.TIME_BUCKETS (311_timeseries only).
+        resolution (int, optional): Geohash length of the grid cells (311_grid only).
+        since (Optional[datetime.datetime], optional): Only return rows changed after this watermark (311_by_geo only).
 
     Returns:
-        str: The constructed SQL query string.
+        Optional[SQLQuery]: The constructed SQL template and its parameters.
 
     Raises:
-        None, but prints an error message and returns an empty string if the data_request is not recognized
+        None, but prints an error message and returns None if the data_request is not recognized
     """
 
     # Set the WHERE clause based on whether the query is looking for TNT-specific data or not
@@ -268,48 +409,39 @@ def build_311_query(
             open_dt AS date,
             latitude,
             longitude,
-            CASE
-                WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-                WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-                WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-                WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-            END AS normalized_type
+            normalized_type
         FROM
             bos311_data
         WHERE 
-            type IN ({SQLConstants.CATEGORY_TYPES[request_options]}) 
+            {SQLConstants.CATEGORY_FILTERS[request_options]}
             AND {Bos311_where_clause}
         """
 
+        params = ()
         if request_date:
-            query += f"""AND DATE_FORMAT(open_dt, '%Y-%m') = '{request_date}'"""
+            query += "AND open_dt >= %s AND open_dt < %s"
+            params = get_month_range(request_date)
 
-        return query
+        return apply_keyset_page(
+            apply_since_filter(SQLQuery(query, params), since), after_id, limit
+        )
     elif data_request == "311_summary_context":
         # This query is used to generate a summary of 311 data for context in the Gemini model
         query = f"""
-        WITH category_aggregates AS (
-            SELECT
-                year,
-                '911 Shot Fired Confirmed - Annual Total' AS incident_type,
-                {SQLConstants.BOS911_TIME_BREAKDOWN},
-                'Category' AS level_type,
-                NULL AS category
-            FROM shots_fired_data
-            WHERE {Bos911_where_clause}
-            AND ballistics_evidence = 1
-            GROUP BY year, incident_type
-            UNION ALL
+        WITH bos911_totals AS (
             SELECT
                 year,
-                '911 Shot Fired Unconfirmed - Annual Total' AS incident_type,
+                CASE
+                    WHEN ballistics_evidence = 1 THEN '911 Shot Fired Confirmed - Annual Total'
+                    ELSE '911 Shot Fired Unconfirmed - Annual Total'
+                END AS incident_type,
                 {SQLConstants.BOS911_TIME_BREAKDOWN},
                 'Category' AS level_type,
                 NULL AS category
             FROM shots_fired_data
             WHERE {Bos911_where_clause}
-            AND ballistics_evidence = 0
-            GROUP BY year, incident_type
+            AND ballistics_evidence IN (0, 1)
+            GROUP BY year, ballistics_evidence
             UNION ALL
             SELECT
                 year,
@@ -320,95 +452,24 @@ def build_311_query(
             FROM homicide_data
             WHERE {SQLConstants.BOS911_BASE_WHERE} # Always uses base where clause because it's pulling from homicide_data, which doesn't have coordinates
             GROUP BY year, incident_type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Trash & Dumping Issues - Annual Total' AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Category' AS level_type,
-                NULL AS category
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['trash']})
-            AND {Bos311_where_clause}
-            GROUP BY year, incident_type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Living Condition Issues - Annual Total' AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Category' AS level_type,
-                NULL AS category
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']})
-            AND {Bos311_where_clause}
-            GROUP BY year, incident_type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Streets Issues - Annual Total' AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Category' AS level_type,
-                NULL AS category
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['streets']})
-            AND {Bos311_where_clause}
-            GROUP BY year, incident_type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Parking Issues - Annual Total' AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Category' AS level_type,
-                NULL AS category
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['parking']})
-            AND {Bos311_where_clause}
-            GROUP BY year, incident_type
         ),
-        type_details AS (
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Trash & Dumping Issues' AS category,
-                type AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Type' AS level_type
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['trash']})
-            AND {Bos311_where_clause}
-            GROUP BY year, type
-            UNION ALL
+        bos311_rollup AS (
+            -- One pass over bos311_data. WITH ROLLUP adds a row per category with a NULL summary_type,
+            -- plus per-year and grand total rows with a NULL summary_category that are dropped below
             SELECT
-                YEAR(open_dt) AS year,
-                '311 Living Condition Issues' AS category,
-                type AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Type' AS level_type
+                YEAR(open_dt) AS summary_year,
+                CASE normalized_type
+                    WHEN 'Trash, Recycling, And Waste' THEN '311 Trash & Dumping Issues'
+                    WHEN 'Living Conditions' THEN '311 Living Condition Issues'
+                    WHEN 'Streets, Sidewalks, And Parks' THEN '311 Streets Issues'
+                    WHEN 'Parking' THEN '311 Parking Issues'
+                END AS summary_category,
+                type AS summary_type,
+                {SQLConstants.BOS311_TIME_BREAKDOWN}
             FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']})
+            WHERE {SQLConstants.CATEGORY_FILTERS['all']}
             AND {Bos311_where_clause}
-            GROUP BY year, type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Streets Issues' AS category,
-                type AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Type' AS level_type
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['streets']})
-            AND {Bos311_where_clause}
-            GROUP BY year, type
-            UNION ALL
-            SELECT
-                YEAR(open_dt) AS year,
-                '311 Parking Issues' AS category,
-                type AS incident_type,
-                {SQLConstants.BOS311_TIME_BREAKDOWN},
-                'Type' AS level_type
-            FROM bos311_data
-            WHERE type IN ({SQLConstants.CATEGORY_TYPES['parking']})
-            AND {Bos311_where_clause}
-            GROUP BY year, type
+            GROUP BY summary_year, summary_category, summary_type WITH ROLLUP
         )
         SELECT
             year,
@@ -419,18 +480,22 @@ def build_311_query(
             jul_total, aug_total, sep_total, oct_total, nov_total, dec_total,
             level_type,
             category
-        FROM category_aggregates
+        FROM bos911_totals
         UNION ALL
         SELECT
-            year,
-            incident_type,
+            summary_year AS year,
+            CASE
+                WHEN summary_type IS NULL THEN CONCAT(summary_category, ' - Annual Total')
+                ELSE summary_type
+            END AS incident_type,
             total_by_year,
             q1_total, q2_total, q3_total, q4_total,
             jan_total, feb_total, mar_total, apr_total, may_total, jun_total,
             jul_total, aug_total, sep_total, oct_total, nov_total, dec_total,
-            level_type,
-            category
-        FROM type_details
+            CASE WHEN summary_type IS NULL THEN 'Category' ELSE 'Type' END AS level_type,
+            CASE WHEN summary_type IS NULL THEN NULL ELSE summary_category END AS category
+        FROM bos311_rollup
+        WHERE summary_category IS NOT NULL
         ORDER BY
             year,
             CASE
@@ -449,41 +514,31 @@ def build_311_query(
             END,
             incident_type;
             """
-        return query
+        return SQLQuery(query)
     elif data_request == "311_summary" and event_ids:
-
-        # Quote each event_id if not already quoted
-        id_list = [f"'{x.strip()}'" for x in event_ids.split(",") if x.strip()]
-        id_str = ",".join(id_list)
-        
-        # This query is used to summarize 311 data for specific event IDs
-        query = f"""
-        SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
-        type AS subcategory,
-        COUNT(*) AS total
-        FROM bos311_data
-        WHERE id IN ({id_str})
-        GROUP BY category, subcategory
-        UNION ALL
+        # This query is used to summarize 311 data for specific event IDs.
+        # The IDs are bound as one JSON array and unnested with JSON_TABLE, so the statement text does not grow
+        # with the number of IDs, and WITH ROLLUP adds each category's TOTAL row in the same pass
+        query = """
         SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
-        'TOTAL' AS subcategory,
-        COUNT(*) AS total
-        FROM bos311_data
-        WHERE id IN ({id_str})
-        GROUP BY
-        category
+            category,
+            subcategory,
+            total
+        FROM (
+            SELECT
+                row_category AS category,
+                IF(GROUPING(row_type) = 1, 'TOTAL', row_type) AS subcategory,
+                COUNT(*) AS total
+            FROM (
+                SELECT
+                    normalized_type AS row_category,
+                    type AS row_type
+                FROM JSON_TABLE(%s, '$[*]' COLUMNS (id BIGINT PATH '$')) AS selected_ids
+                INNER JOIN bos311_data ON bos311_data.id = selected_ids.id
+            ) AS selected_rows
+            GROUP BY row_category, row_type WITH ROLLUP
+            HAVING GROUPING(row_category) = 0
+        ) AS summary
         ORDER BY
         category,
         CASE
@@ -492,39 +547,40 @@ def build_311_query(
         END,
         total DESC;
         """
-        return query
+        return SQLQuery(query, (json.dumps(parse_event_ids(event_ids)),))
+    elif (
+        data_request == "311_summary"
+        and request_options
+        and Config.BOS311_ROLLUP_ENABLED
+    ):
+        # Summaries by category and optional month are answered from the monthly rollup table
+        return build_311_rollup_summary_query(
+            request_options=request_options,
+            request_date=request_date,
+            is_spatial=is_spatial,
+        )
     elif data_request == "311_summary" and request_date and request_options:
         # This query is used to summarize 311 data for a specific date and request options
         query = f"""
         SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
+        normalized_type AS category,
         type AS subcategory,
         COUNT(*) AS total
         FROM bos311_data
         WHERE
-            DATE_FORMAT(open_dt, '%Y-%m') = '{request_date}'
-            AND type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+            open_dt >= %s AND open_dt < %s
+            AND {SQLConstants.CATEGORY_FILTERS[request_options]}
             AND {Bos311_where_clause}
         GROUP BY category, subcategory
         UNION ALL
         SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
+        normalized_type AS category,
         'TOTAL' AS subcategory,
         COUNT(*) AS total
         FROM bos311_data
         WHERE
-            DATE_FORMAT(open_dt, '%Y-%m') = '{request_date}'
-            AND type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+            open_dt >= %s AND open_dt < %s
+            AND {SQLConstants.CATEGORY_FILTERS[request_options]}
             AND {Bos311_where_clause}
         GROUP BY
         category
@@ -536,7 +592,7 @@ def build_311_query(
         END,
         total DESC;
         """
-        return query
+        return SQLQuery(query, get_month_range(request_date) * 2)
     elif (
         data_request == "311_summary"
         and not request_date
@@ -546,32 +602,22 @@ def build_311_query(
         # This query is used to summarize 311 data for specific request options without date or event IDs
         query = f"""
         SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
+        normalized_type AS category,
         type AS subcategory,
         COUNT(*) AS total
         FROM bos311_data
         WHERE
-            type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+            {SQLConstants.CATEGORY_FILTERS[request_options]}
             AND {Bos311_where_clause}
         GROUP BY category, subcategory
         UNION ALL
         SELECT
-        CASE
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
-            WHEN type IN ({SQLConstants.CATEGORY_TYPES['parking']}) THEN 'Parking'
-        END AS category,
+        normalized_type AS category,
         'TOTAL' AS subcategory,
         COUNT(*) AS total
         FROM bos311_data
         WHERE
-            type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+            {SQLConstants.CATEGORY_FILTERS[request_options]}
             AND {Bos311_where_clause}
         GROUP BY
         category
@@ -583,28 +629,200 @@ def build_311_query(
         END,
         total DESC;
         """
-        return query
+        return SQLQuery(query)
+    elif data_request == "311_timeseries":
+        return build_311_timeseries_query(
+            request_options=request_options or "all",
+            request_date=request_date,
+            is_spatial=is_spatial,
+            bucket=bucket or "month",
+        )
+    elif data_request == "311_grid":
+        # Counts per geohash cell, so a heatmap gets a few thousand cells instead of every point
+        query = f"""
+        SELECT
+            cell,
+            ST_LatFromGeoHash(cell) AS latitude,
+            ST_LongFromGeoHash(cell) AS longitude,
+            total
+        FROM (
+            SELECT
+                ST_GeoHash(longitude, latitude, %s) AS cell,
+                COUNT(*) AS total
+            FROM bos311_data
+            WHERE
+                {SQLConstants.CATEGORY_FILTERS[request_options or 'all']}
+                AND {Bos311_where_clause}
+                AND {SQLConstants.VALID_COORDINATES_WHERE}
+                {"AND open_dt >= %s AND open_dt < %s" if request_date else ""}
+            GROUP BY cell
+        ) AS cells
+        ORDER BY cell;
+        """
+        params = (resolution or DEFAULT_GRID_RESOLUTION,)
+        if request_date:
+            params += get_month_range(request_date)
+        return SQLQuery(query, params)
     else:
         # If the data_request is not recognized, print an error message and return an empty string
         print(
             f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error generating query:{Font_Colors.ENDC}: check query args"
         )
-        return ""
+        return None
+
+
+def build_311_rollup_summary_query(
+    request_options: str, request_date: str = "", is_spatial=False
+) -> SQLQuery:
+    """
+    Build a 311_summary SQL query against the pre-aggregated monthly rollup table.
+    Returns the same category, subcategory and total columns as the bos311_data summary queries.
+
+    Args:
+        request_options (str): The category to summarize (e.g., "living_conditions", "all").
+        request_date (str, optional): Date in 'YYYY-MM' format for filtering results.
+        is_spatial (bool, optional): Whether to limit results to the TNT polygon.
+
+    Returns:
+        SQLQuery: The constructed SQL template and its parameters.
+    """
+
+    rollup_where_clause = (
+        SQLConstants.BOS311_ROLLUP_SPATIAL_WHERE
+        if is_spatial
+        else SQLConstants.BOS311_BASE_WHERE
+    )
+    params = ()
+    if request_date:
+        rollup_where_clause += " AND month = %s"
+        params = (get_month_range(request_date)[0],)
+
+    query = f"""
+    SELECT
+        category,
+        type AS subcategory,
+        CAST(SUM(total) AS SIGNED) AS total
+    FROM {SQLConstants.BOS311_ROLLUP_TABLE}
+    WHERE
+        type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+        AND {rollup_where_clause}
+    GROUP BY category, subcategory
+    UNION ALL
+    SELECT
+        category,
+        'TOTAL' AS subcategory,
+        CAST(SUM(total) AS SIGNED) AS total
+    FROM {SQLConstants.BOS311_ROLLUP_TABLE}
+    WHERE
+        type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+        AND {rollup_where_clause}
+    GROUP BY category
+    ORDER BY
+    category,
+    CASE
+        WHEN subcategory = 'TOTAL' THEN 2
+        ELSE 1
+    END,
+    total DESC;
+    """
+    return SQLQuery(query, params * 2)
+
+
+def build_311_timeseries_query(
+    request_options: str, request_date: str = "", is_spatial=False, bucket: str = "month"
+) -> SQLQuery:
+    """
+    Build a 311 time series query, counting requests per time bucket and category in one GROUP BY.
+    Month and quarter buckets are summed from the monthly rollup table when it is enabled.
+
+    Args:
+        request_options (str): The category to count (e.g., "living_conditions", "all").
+        request_date (str, optional): Date in 'YYYY-MM' format to limit the series to one month.
+        is_spatial (bool, optional): Whether to limit results to the TNT polygon.
+        bucket (str, optional): A key of SQLConstants.TIME_BUCKETS.
+
+    Returns:
+        SQLQuery: The constructed SQL template and its parameters, returning bucket (the bucket's first day as
+        'YYYY-MM-DD'), category and total.
+    """
+
+    if bucket in ("month", "quarter") and Config.BOS311_ROLLUP_ENABLED:
+        where_clause = (
+            SQLConstants.BOS311_ROLLUP_SPATIAL_WHERE
+            if is_spatial
+            else SQLConstants.BOS311_BASE_WHERE
+        )
+        params = ()
+        if request_date:
+            where_clause += " AND month = %s"
+            params = (get_month_range(request_date)[0],)
+
+        query = f"""
+        SELECT
+            DATE_FORMAT({SQLConstants.TIME_BUCKETS[bucket].format(column="month")}, '%Y-%m-%d') AS bucket,
+            category,
+            CAST(SUM(total) AS SIGNED) AS total
+        FROM {SQLConstants.BOS311_ROLLUP_TABLE}
+        WHERE
+            type IN ({SQLConstants.CATEGORY_TYPES[request_options]})
+            AND {where_clause}
+        GROUP BY bucket, category
+        ORDER BY bucket, category;
+        """
+        return SQLQuery(query, params)
+
+    where_clause = (
+        SQLConstants.BOS311_SPATIAL_WHERE if is_spatial else SQLConstants.BOS311_BASE_WHERE
+    )
+    params = ()
+    if request_date:
+        where_clause += " AND open_dt >= %s AND open_dt < %s"
+        params = get_month_range(request_date)
+
+    query = f"""
+    SELECT
+        DATE_FORMAT({SQLConstants.TIME_BUCKETS[bucket].format(column="open_dt")}, '%Y-%m-%d') AS bucket,
+        normalized_type AS category,
+        COUNT(*) AS total
+    FROM bos311_data
+    WHERE
+        {SQLConstants.CATEGORY_FILTERS[request_options]}
+        AND {where_clause}
+    GROUP BY bucket, category
+    ORDER BY bucket, category;
+    """
+    return SQLQuery(query, params)
 
 
-def build_911_query(data_request: str, is_spatial=False) -> str:
+def build_911_query(
+    data_request: str,
+    is_spatial=False,
+    after_id: str = "",
+    limit: int = 0,
+    request_date: str = "",
+    bucket: str = "",
+    resolution: int = 0,
+    since: Optional[datetime.datetime] = None,
+) -> Optional[SQLQuery]:
     """
     Build SQL query for 911 data based on the request type.
 
     Args:
         data_request (str): The type of data request (e.g., "911_shots_fired", "911_homicides_and_shots_fired").
         is_spatial (bool, optional): Whether to use spatial queries based on coordinates.
+        after_id (str, optional): Only return rows with an id greater than this (911_shots_fired only).
+        limit (int, optional): Page size; when set, rows are ordered by id (911_shots_fired only).
+        request_date (str, optional): Date in 'YYYY-MM' format to limit the series to one month (911_timeseries only).
+        bucket (str, optional): Time series bucket, a key of SQLConstants.TIME_BUCKETS (911_timeseries only).
+        resolution (int, optional): Geohash length of the grid cells (911_grid only).
+        since (Optional[datetime.datetime], optional): Only return rows changed after this watermark
+            (911_shots_fired only).
 
     Returns:
-        str: The constructed SQL query string.
+        Optional[SQLQuery]: The constructed SQL template and its parameters.
     
     Raises:
-        None, but returns an empty string if the data_request is not recognized.
+        None, but returns None if the data_request is not recognized.
     """
 
     Bos911_where_clause = (
@@ -625,12 +843,31 @@ def build_911_query(data_request: str, is_spatial=False) -> str:
         WHERE {Bos911_where_clause}
             AND latitude IS NOT NULL
             AND longitude IS NOT NULL
-        GROUP BY id, date, ballistics_evidence, latitude, longitude;
         """
 
-        return query
+        return apply_keyset_page(
+            apply_since_filter(SQLQuery(query), since),
+            after_id,
+            limit,
+            group_by="GROUP BY id, date, ballistics_evidence, latitude, longitude",
+        )
+    elif (
+        data_request == "911_homicides_and_shots_fired"
+        and Config.HOMICIDE_SHOTS_LINK_ENABLED
+    ):
+        # The same-day join is precomputed at ingest, so this is a scan of a small table
+        query = f"""
+        SELECT
+            shot_id AS id,
+            homicide_date AS date,
+            latitude,
+            longitude
+        FROM {SQLConstants.BOS911_HOMICIDE_SHOTS_TABLE}
+        """
+
+        return SQLQuery(query)
     elif data_request == "911_homicides_and_shots_fired":
-        return f"""
+        query = f"""
         SELECT
             s.id as id,
             h.homicide_date as date,
@@ -650,61 +887,377 @@ def build_911_query(data_request: str, is_spatial=False) -> str:
             AND s.year >= 2018
             AND s.year < 2025
         """
-    return ""
 
+        return SQLQuery(query)
+    elif data_request == "911_timeseries":
+        # Homicides have no coordinates, so they always use the base where clause
+        shots_bucket = SQLConstants.TIME_BUCKETS[bucket or "month"].format(column="incident_date_time")
+        homicides_bucket = SQLConstants.TIME_BUCKETS[bucket or "month"].format(column="homicide_date")
+        shots_where_clause = Bos911_where_clause
+        homicides_where_clause = SQLConstants.BOS911_BASE_WHERE
+        params = ()
+        if request_date:
+            shots_where_clause += " AND incident_date_time >= %s AND incident_date_time < %s"
+            homicides_where_clause += " AND homicide_date >= %s AND homicide_date < %s"
+            params = get_month_range(request_date) * 2
 
-#
-# Helper functions
-#
+        query = f"""
+        SELECT
+            DATE_FORMAT({shots_bucket}, '%Y-%m-%d') AS bucket,
+            CASE
+                WHEN ballistics_evidence = 1 THEN 'Shots Fired Confirmed'
+                ELSE 'Shots Fired Unconfirmed'
+            END AS category,
+            COUNT(*) AS total
+        FROM shots_fired_data
+        WHERE {shots_where_clause}
+            AND ballistics_evidence IN (0, 1)
+        GROUP BY bucket, category
+        UNION ALL
+        SELECT
+            DATE_FORMAT({homicides_bucket}, '%Y-%m-%d') AS bucket,
+            'Homicides' AS category,
+            COUNT(*) AS total
+        FROM homicide_data
+        WHERE {homicides_where_clause}
+        GROUP BY bucket
+        ORDER BY bucket, category;
+        """
+
+        return SQLQuery(query, params)
+    elif data_request == "911_grid":
+        # Shots fired per geohash cell; homicides have no coordinates
+        query = f"""
+        SELECT
+            cell,
+            ST_LatFromGeoHash(cell) AS latitude,
+            ST_LongFromGeoHash(cell) AS longitude,
+            total,
+            confirmed
+        FROM (
+            SELECT
+                ST_GeoHash(longitude, latitude, %s) AS cell,
+                COUNT(*) AS total,
+                CAST(SUM(ballistics_evidence = 1) AS SIGNED) AS confirmed
+            FROM shots_fired_data
+            WHERE {Bos911_where_clause}
+                AND {SQLConstants.VALID_COORDINATES_WHERE}
+                {"AND incident_date_time >= %s AND incident_date_time < %s" if request_date else ""}
+            GROUP BY cell
+        ) AS cells
+        ORDER BY cell;
+        """
+        params = (resolution or DEFAULT_GRID_RESOLUTION,)
+        if request_date:
+            params += get_month_range(request_date)
+        return SQLQuery(query, params)
+    return None
 
 
-def check_date_format(date_string: str) -> bool:
+def apply_since_filter(
+    query: SQLQuery, since: Optional[datetime.datetime] = None
+) -> SQLQuery:
     """
-    Check if the given date string is in 'YYYY-MM' format and if the month is valid.
+    Limit a query whose last clause is its WHERE clause to rows inserted or updated after a watermark.
+    Uses the indexed row update timestamp added by data_maintenance.py.
 
     Args:
-        date_string (str): The date string to check.
-    
-    Returns:
-        bool: True if the date string is in 'YYYY-MM' format and the month is valid, False otherwise.
+        query (SQLQuery): The query to filter.
+        since (Optional[datetime.datetime], optional): The watermark. When None, the query is returned unchanged.
 
-    Raises:
-        None
+    Returns:
+        SQLQuery: The filtered query.
     """
-    
-    pattern = r"^\d{4}-\d{2}$"
-    if not re.match(pattern, date_string):
-        return False
 
-    year, month = map(int, date_string.split("-"))
-    return 1 <= month <= 12
+    if since is None:
+        return query
+    return SQLQuery(
+        query.sql + f"\n        AND {SQLConstants.ROW_UPDATED_COLUMN} > %s",
+        query.params + (since,),
+    )
 
 
-def check_filetype(filename: str) -> bool:
+def apply_keyset_page(
+    query: SQLQuery, after_id: str = "", limit: int = 0, group_by: str = ""
+) -> SQLQuery:
     """
-    Check if the given filename has an allowed file extension.
+    Add keyset pagination to a query whose last clause is its WHERE clause.
+    Rows after `after_id` are read in primary key order, so each page is an index range scan rather than an OFFSET.
 
     Args:
-        filename (str): The name of the file to check.
+        query (SQLQuery): The query to paginate. It must select the primary key as `id`.
+        after_id (str, optional): Only return rows with an id greater than this.
+        limit (int, optional): The page size. When 0, the query is not ordered or limited.
+        group_by (str, optional): A GROUP BY clause to place between the WHERE clause and the ORDER BY.
 
     Returns:
-        bool: True if the file has an allowed extension, False otherwise.
-    
-    Raises:
-        None 
+        SQLQuery: The paginated query.
     """
-    return (
-        "." in filename
-        and filename.rsplit(".", 1)[1].lower() in Config.ALLOWED_EXTENSIONS
-    )
 
+    sql = query.sql
+    params = query.params
+    if after_id:
+        sql += "\n        AND id > %s"
+        params += (after_id,)
+    if group_by:
+        sql += f"\n        {group_by}"
+    if limit:
+        sql += "\n        ORDER BY id\n        LIMIT %s"
+        params += (limit,)
+    return SQLQuery(sql, params)
+
+
+def build_tile_query(
+    data_request: str,
+    bounds: Tuple[float, float, float, float],
+    request_options: str = "",
+    request_date: str = "",
+    is_spatial=False,
+) -> Optional[SQLQuery]:
+    """
+    Build SQL query for the incident points inside a vector tile.
+    Uses the same category and base/spatial filters as 311_by_geo and 911_shots_fired, limited to the tile's bounding box.
+
+    Args:
+        data_request (str): The layer to query ("311_by_geo" or "911_shots_fired").
+        bounds (Tuple[float, float, float, float]): (min longitude, min latitude, max longitude, max latitude) of the tile.
+        request_options (str, optional): The 311 category (e.g., "living_conditions", "all").
+        request_date (str, optional): Date in 'YYYY-MM' format for filtering results.
+        is_spatial (bool, optional): Whether to limit results to the TNT polygon.
+
+    Returns:
+        Optional[SQLQuery]: The constructed SQL template and its parameters, or None if the data_request is not recognized.
+    """
+
+    lon_min, lat_min, lon_max, lat_max = bounds
+    bbox_params = (lat_min, lat_max, lon_min, lon_max)
+
+    if data_request == "311_by_geo" and request_options:
+        Bos311_where_clause = (
+            SQLConstants.BOS311_SPATIAL_WHERE
+            if is_spatial
+            else SQLConstants.BOS311_BASE_WHERE
+        )
+        date_clause = ""
+        date_params = ()
+        if request_date:
+            date_clause = "AND open_dt >= %s AND open_dt < %s"
+            date_params = get_month_range(request_date)
+
+        query = f"""
+        SELECT
+            id,
+            type,
+            open_dt AS date,
+            normalized_type,
+            latitude,
+            longitude
+        FROM bos311_data
+        WHERE
+            {SQLConstants.CATEGORY_FILTERS[request_options]}
+            AND {Bos311_where_clause}
+            AND latitude BETWEEN %s AND %s
+            AND longitude BETWEEN %s AND %s
+            {date_clause}
+        LIMIT %s
+        """
+        return SQLQuery(query, bbox_params + date_params + (Config.TILE_MAX_FEATURES,))
+    elif data_request == "911_shots_fired":
+        Bos911_where_clause = (
+            SQLConstants.BOS911_SPATIAL_WHERE
+            if is_spatial
+            else SQLConstants.BOS911_BASE_WHERE
+        )
+        query = f"""
+        SELECT
+            id,
+            incident_date_time AS date,
+            ballistics_evidence,
+            latitude,
+            longitude
+        FROM shots_fired_data
+        WHERE {Bos911_where_clause}
+            AND latitude BETWEEN %s AND %s
+            AND longitude BETWEEN %s AND %s
+        LIMIT %s
+        """
+        return SQLQuery(query, bbox_params + (Config.TILE_MAX_FEATURES,))
+    return None
+
+
+#
+# Helper functions
+#
+
+
+def check_date_format(date_string: str) -> bool:
+    """
+    Check if the given date string is in 'YYYY-MM' format and if the month is valid.
+
+    Args:
+        date_string (str): The date string to check.
+    
+    Returns:
+        bool: True if the date string is in 'YYYY-MM' format and the month is valid, False otherwise.
+
+    Raises:
+        None
+    """
+    
+    pattern = r"^\d{4}-\d{2}$"
+    if not re.match(pattern, date_string):
+        return False
+
+    year, month = map(int, date_string.split("-"))
+    return 1 <= month <= 12
+
+
+def get_month_range(date_string: str) -> Tuple[datetime.date, datetime.date]:
+    """
+    Get the first day of a 'YYYY-MM' month and the first day of the following month.
+    Used to filter on a half-open date range instead of formatting every row's date.
 
-def get_files(
-    file_type: Optional[str] = None, specific_files: Optional[List[str]] = None
-) -> List[str]:
-    """
-    Get a list of files from the datastore directory.
-    
+    Args:
+        date_string (str): The date string in 'YYYY-MM' format.
+
+    Returns:
+        Tuple[datetime.date, datetime.date]: The start (inclusive) and end (exclusive) of the month.
+
+    Raises:
+        ValueError: If the date string is not a valid 'YYYY-MM' month.
+    """
+
+    if not check_date_format(date_string):
+        raise ValueError(f'Incorrect date format "{date_string}". Expects "YYYY-MM"')
+
+    year, month = map(int, date_string.split("-"))
+    month_start = datetime.date(year, month, 1)
+    if month == 12:
+        return month_start, datetime.date(year + 1, 1, 1)
+    return month_start, datetime.date(year, month + 1, 1)
+
+
+def encode_page_cursor(last_id) -> str:
+    """
+    Encode the last id of a page as an opaque continuation token.
+
+    Args:
+        last_id: The id of the last row on the page.
+
+    Returns:
+        str: A URL-safe continuation token.
+    """
+
+    payload = json.dumps({"after_id": str(last_id)}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(token: str) -> str:
+    """
+    Decode a continuation token from encode_page_cursor.
+
+    Args:
+        token (str): The continuation token.
+
+    Returns:
+        str: The id to continue after.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return str(json.loads(base64.urlsafe_b64decode(padded))["after_id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+
+class PageCursor:
+    """
+    Continuation token of a keyset-paginated query, taken from the rows as they are read.
+    The result functions read the whole page in their first batch, so the token is known before the first chunk is
+    sent and can go out as the X-Next-Cursor header without querying the page a second time.
+
+    Args:
+        limit (int): The page size.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.row_count = 0
+        self.last_id = None
+
+    def observe(self, rows: list, description) -> None:
+        """Record a batch of tuple rows read from a cursor with the given description."""
+        if not rows:
+            return
+        id_index = [column[0] for column in description].index("id")
+        self.row_count += len(rows)
+        self.last_id = rows[-1][id_index]
+
+    @property
+    def token(self) -> str:
+        """The token for the next page, or an empty string if this is the last page."""
+        if self.last_id is None or self.row_count < self.limit:
+            return ""
+        return encode_page_cursor(self.last_id)
+
+
+def parse_event_ids(event_ids: str) -> List[int]:
+    """
+    Parse a comma-separated list of 311 event IDs, dropping duplicates.
+
+    Args:
+        event_ids (str): The IDs, optionally quoted (e.g., "1718415,'1716303'").
+
+    Returns:
+        List[int]: The unique IDs in their original order.
+
+    Raises:
+        ValueError: If an ID is not an integer, or there are more than Config.MAX_EVENT_IDS IDs.
+    """
+
+    ids = []
+    for event_id in event_ids.split(","):
+        event_id = event_id.strip().strip("'")
+        if not event_id:
+            continue
+        if not event_id.isdigit():
+            raise ValueError(f"Invalid event id: {event_id}")
+        ids.append(int(event_id))
+
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > Config.MAX_EVENT_IDS:
+        raise ValueError(f"Too many event_ids, the limit is {Config.MAX_EVENT_IDS}")
+    return ids
+
+
+def check_filetype(filename: str) -> bool:
+    """
+    Check if the given filename has an allowed file extension.
+
+    Args:
+        filename (str): The name of the file to check.
+
+    Returns:
+        bool: True if the file has an allowed extension, False otherwise.
+    
+    Raises:
+        None 
+    """
+    return (
+        "." in filename
+        and filename.rsplit(".", 1)[1].lower() in Config.ALLOWED_EXTENSIONS
+    )
+
+
+def get_files(
+    file_type: Optional[str] = None, specific_files: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Get a list of files from the datastore directory.
+    
     Args:
         file_type (str, optional): The type of file to filter by (e.g., "csv", "txt").
         specific_files (List[str], optional): A list of specific filenames to retrieve.
@@ -788,27 +1341,593 @@ def get_file_content(filename: str) -> Optional[str]:
         return None
 
 
-def get_db_connection():
+def get_db_connection(read_only: bool = False):
     """
     Get a database connection from the connection pool.
-    
+    When every connection is in use, waits up to Config.DB_POOL_TIMEOUT seconds for one to be returned.
+    Read-only connections come from the read replicas when any are configured, falling back to the primary when
+    no replica can provide one. Writes, and reads that must see them, use the primary.
+
+    Args:
+        read_only (bool, optional): Whether the connection is only used for analytical reads.
+
     Returns:
-        mysql.connector.connection.MySQLConnection: A connection object from the MySQL connection pool.
+        connection_pool.PooledConnection: A connection object from the MySQL connection pool.
+
+    Raises:
+        mysql.connector.errors.PoolError: If too many requests are already waiting or none is returned in time.
     """
 
     # Uncomment the line below to use a direct connection instead of a pool
     # return mysql.connector.connect(**Config.DB_CONFIG)
 
+    if read_only and replica_router is not None:
+        conn = replica_router.get_connection()
+        if conn is not None:
+            return conn
+
     # Use the connection pool to get a connection
     return db_pool.get_connection()
 
 
-def json_query_results(query: str) -> Optional[Response]:
+# MySQL error raised when a statement runs past its MAX_EXECUTION_TIME
+ER_QUERY_TIMEOUT = 3024
+
+
+def query_timeout_error(err: mysql.connector.Error, query: SQLQuery) -> QueryTimeoutError:
+    """
+    Build the QueryTimeoutError raised in place of a MySQL MAX_EXECUTION_TIME error.
+    MySQL sends the result metadata before it runs the query, so the limit usually fires while rows are fetched
+    rather than in execute_query, and the result functions map errors from their fetch loops too.
+    """
+    return QueryTimeoutError(
+        msg=f"Query exceeded its {query.timeout_ms} ms time limit",
+        errno=err.errno,
+        sqlstate=err.sqlstate,
+    )
+
+
+def with_query_timeout(query: Optional[SQLQuery], data_request: str) -> Optional[SQLQuery]:
+    """
+    Attach the execution time limit configured for a request type to a query.
+
+    Args:
+        query (Optional[SQLQuery]): The query from a query builder.
+        data_request (str): The request type, looked up in Config.QUERY_TIMEOUTS_MS.
+
+    Returns:
+        Optional[SQLQuery]: The query with its timeout_ms set, or None if no query was given.
+    """
+
+    if query is None:
+        return None
+    return query._replace(
+        timeout_ms=Config.QUERY_TIMEOUTS_MS.get(data_request, Config.QUERY_TIMEOUT_MS)
+    )
+
+
+def add_execution_time_hint(sql: str, timeout_ms: int) -> str:
+    """
+    Add a MAX_EXECUTION_TIME optimizer hint to the main SELECT of a statement.
+    The main SELECT is the first one outside parentheses, string literals and comments, so the hint lands after any
+    WITH clause.
+
+    Args:
+        sql (str): The statement.
+        timeout_ms (int): The limit in milliseconds. When 0, the statement is returned unchanged.
+
+    Returns:
+        str: The statement with the hint, or unchanged if it has no top-level SELECT.
+    """
+
+    if timeout_ms <= 0:
+        return sql
+
+    depth = 0
+    index = 0
+    while index < len(sql):
+        char = sql[index]
+        if char in ("'", '"'):
+            # Skip the string literal
+            end = sql.find(char, index + 1)
+            index = len(sql) if end == -1 else end + 1
+            continue
+        if char == "#" or sql.startswith("-- ", index):
+            # Skip the line comment
+            end = sql.find("\n", index)
+            index = len(sql) if end == -1 else end + 1
+            continue
+        if sql.startswith("/*", index):
+            end = sql.find("*/", index + 2)
+            index = len(sql) if end == -1 else end + 2
+            continue
+
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif (
+            depth == 0
+            and sql[index : index + 6].upper() == "SELECT"
+            and (index == 0 or not (sql[index - 1].isalnum() or sql[index - 1] == "_"))
+        ):
+            end = index + 6
+            return f"{sql[:end]} /*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */{sql[end:]}"
+        index += 1
+    return sql
+
+
+def execute_query(conn, query: SQLQuery, dictionary: bool = True):
+    """
+    Execute a query as a server-side prepared statement on a pooled connection.
+    Each SQL template is prepared once per connection and re-executed with new parameters on later requests,
+    so MySQL does not re-parse the statement. The returned cursor is owned by the cache and must not be closed;
+    call discard_query if its result set is abandoned before it is fully read.
+
+    Args:
+        conn (mysql.connector.pooling.PooledMySQLConnection): A connection from the pool.
+        query (SQLQuery): The SQL template and its parameters.
+        dictionary (bool, optional): Whether rows are returned as dictionaries or tuples (default is True).
+
+    Returns:
+        mysql.connector.cursor.MySQLCursorPrepared: An unbuffered cursor positioned on the result set.
+
+    Raises:
+        mysql.connector.Error: If there is an error preparing or executing the statement.
+    """
+
+    raw_conn = getattr(conn, "_cnx", conn)
+    statements = prepared_statements.setdefault(raw_conn, {})
+    statement_key = (query.sql, query.timeout_ms, dictionary)
+
+    # The connector only skips re-preparing when it is handed the same statement object it prepared last,
+    # so the cleaned-up statement text is cached alongside its cursor
+    cached = statements.pop(statement_key, None)
+    prepared_before = cached is not None
+    if not prepared_before:
+        # Prepared statements must be a single statement without a trailing delimiter
+        statement = add_execution_time_hint(query.sql.strip().rstrip(";"), query.timeout_ms)
+        cached = (raw_conn.cursor(prepared=True, dictionary=dictionary), statement)
+    cursor, statement = cached
+
+    try:
+        try:
+            cursor.execute(statement, query.params)
+        except mysql.connector.Error as err:
+            if not prepared_before or err.errno == ER_QUERY_TIMEOUT:
+                raise
+            # The cached statement no longer works on this connection: it was dropped server-side (1243), or it
+            # belongs to a client handle replaced by a reconnect (CR_STMT_CLOSED, CR_SERVER_LOST). Prepare it once more
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+            cursor = raw_conn.cursor(prepared=True, dictionary=dictionary)
+            cursor.execute(statement, query.params)
+    except mysql.connector.Error as err:
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
+        raise
+
+    # Only statements that executed are cached, a failed one is prepared again by the next request
+    statements[statement_key] = (cursor, statement)
+    return cursor
+
+
+def discard_query(
+    conn, query: SQLQuery, dictionary: bool = True, kill: bool = False
+) -> None:
+    """
+    Drop a cached prepared statement whose result set was not fully read, so the next request prepares it again.
+    execute_query only caches statements that executed, so a cached entry here means its result set was started.
+
+    Args:
+        conn (mysql.connector.pooling.PooledMySQLConnection): The connection the query was executed on.
+        query (SQLQuery): The SQL template that was executed.
+        dictionary (bool, optional): Whether the query was executed with a dictionary cursor (default is True).
+        kill (bool, optional): The caller stopped reading before the last row, e.g. when a client disconnects from a
+            stream. The statement is stopped on the server with KILL QUERY instead of reading its remaining rows
+            (default is False).
+    """
+
+    raw_conn = getattr(conn, "_cnx", conn)
+    cached = prepared_statements.get(raw_conn, {}).pop(
+        (query.sql, query.timeout_ms, dictionary), None
+    )
+    if cached is None:
+        return
+    # The connector's unread_result flag is not set for prepared statement results with the C extension,
+    # so the caller's own record of whether it read every row decides
+    if kill:
+        kill_running_query(raw_conn)
+    try:
+        raw_conn.consume_results()
+    except mysql.connector.Error:
+        pass
+    finally:
+        # Closed on its own, so the server-side statement is released even when the killed result cannot be read
+        try:
+            cached[0].close()
+        except mysql.connector.Error:
+            pass
+
+
+def kill_running_query(raw_conn) -> None:
+    """
+    Stop the statement running on a connection with KILL QUERY, so MySQL stops producing rows nobody will read.
+    The KILL is sent on a short-lived connection outside the pool, so it cannot wait behind the streams it cancels,
+    to the server the statement is running on, which may be a read replica.
+
+    Args:
+        raw_conn (mysql.connector.connection.MySQLConnection): The physical connection running the statement.
+    """
+
+    try:
+        killer = mysql.connector.connect(
+            **{
+                **Config.DB_CONFIG,
+                "host": raw_conn.server_host,
+                "port": raw_conn.server_port,
+            }
+        )
+        try:
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(raw_conn.connection_id)}")
+            cursor.close()
+        finally:
+            killer.close()
+    except mysql.connector.Error as err:
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error cancelling query (kill_running_query):{Font_Colors.ENDC} {str(err)}"
+        )
+
+
+def get_column_encoders(description) -> List[tuple]:
+    """
+    Choose a JSON-friendly converter for each result column from the cursor description.
+    Converters are picked once per result set instead of inspecting every value.
+
+    Args:
+        description (list): The cursor description, one (name, type_code, ...) entry per column.
+
+    Returns:
+        List[tuple]: (column index, converter) pairs for the columns that need converting.
+    """
+
+    temporal_types = (
+        FieldType.DATE,
+        FieldType.DATETIME,
+        FieldType.TIMESTAMP,
+        FieldType.NEWDATE,
+    )
+    decimal_types = (FieldType.DECIMAL, FieldType.NEWDECIMAL)
+
+    encoders = []
+    for index, column in enumerate(description):
+        if column[1] in temporal_types:
+            encoders.append((index, lambda value: value.isoformat()))
+        elif column[1] in decimal_types:
+            encoders.append((index, float))
+    return encoders
+
+
+def encode_row_batch(rows: List[tuple], encoders: List[tuple]) -> List[list]:
+    """
+    Apply the column converters from get_column_encoders to a batch of tuple rows.
+
+    Args:
+        rows (List[tuple]): Rows as returned by a tuple cursor.
+        encoders (List[tuple]): (column index, converter) pairs.
+
+    Returns:
+        List[list]: The converted rows. NULL values are left as None.
+    """
+
+    encoded_rows = []
+    for row in rows:
+        values = list(row)
+        for index, encoder in encoders:
+            if values[index] is not None:
+                values[index] = encoder(values[index])
+        encoded_rows.append(values)
+    return encoded_rows
+
+
+# Data version cached in-process, re-read at most every Config.DATA_VERSION_TTL seconds
+data_version_state = {"version": 0, "updated_at": None, "checked_at": 0.0}
+data_version_lock = threading.Lock()
+
+
+def get_data_version() -> int:
+    """
+    Get the current ingest data version, bumped by data_maintenance.py after every ingest.
+    Used as part of cache keys so cached data is invalidated as soon as new data is loaded.
+
+    Returns:
+        int: The data version, or the last known version (0 if never read) if the database cannot be reached.
+    """
+
+    now = time.monotonic()
+    with data_version_lock:
+        if now - data_version_state["checked_at"] < Config.DATA_VERSION_TTL:
+            return data_version_state["version"]
+
+    try:
+        conn = get_db_connection()
+        cursor = execute_query(
+            conn,
+            SQLQuery(
+                f"SELECT version, updated_at FROM {SQLConstants.DATA_VERSION_TABLE} WHERE name = 'all'"
+            ),
+            dictionary=False,
+        )
+        row = cursor.fetchone()
+        cursor.fetchall()
+        with data_version_lock:
+            data_version_state["version"] = row[0] if row else 0
+            data_version_state["updated_at"] = row[1] if row else None
+            data_version_state["checked_at"] = now
+    except mysql.connector.Error as err:
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (get_data_version):{Font_Colors.ENDC} {str(err)}"
+        )
+    finally:
+        if "conn" in locals() and conn:
+            conn.close()
+
+    return data_version_state["version"]
+
+
+def get_data_watermark() -> str:
+    """
+    Get the watermark for since= delta queries: the time the last ingest finished and bumped the data version.
+    Every row written by that ingest, or any before it, was changed before this time.
+
+    Returns:
+        str: The watermark as an ISO 8601 timestamp, or an empty string if no ingest has bumped the data version.
+    """
+
+    get_data_version()
+    with data_version_lock:
+        updated_at = data_version_state["updated_at"]
+    return updated_at.isoformat() if updated_at else ""
+
+
+# Encoded vector tiles, keyed by data version and tile parameters and bounded by their total size in bytes
+tile_cache = LRUCache(maxsize=Config.TILE_CACHE_MAX_BYTES, getsizeof=len)
+tile_cache_lock = threading.Lock()
+
+
+def get_vector_tile(
+    data_request: str,
+    z: int,
+    x: int,
+    y: int,
+    request_options: str = "",
+    request_date: str = "",
+    is_spatial: bool = False,
+) -> Optional[bytes]:
+    """
+    Get an encoded Mapbox Vector Tile of incident points, from the tile cache when possible.
+
+    Args:
+        data_request (str): The layer to query ("311_by_geo" or "911_shots_fired").
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row.
+        request_options (str, optional): The 311 category.
+        request_date (str, optional): Date in 'YYYY-MM' format for filtering results.
+        is_spatial (bool, optional): Whether to limit results to the TNT polygon.
+
+    Returns:
+        Optional[bytes]: The encoded tile, or None if the request is invalid or the query fails.
+
+    Raises:
+        QueryTimeoutError: If the tile query runs past its time limit.
+    """
+
+    cache_key = (
+        get_data_version(),
+        data_request,
+        request_options,
+        request_date,
+        is_spatial,
+        z,
+        x,
+        y,
+    )
+    with tile_cache_lock:
+        tile = tile_cache.get(cache_key)
+    if tile is not None:
+        return tile
+
+    query = with_query_timeout(
+        build_tile_query(
+            data_request=data_request,
+            bounds=tile_bounds(z, x, y),
+            request_options=request_options,
+            request_date=request_date,
+            is_spatial=is_spatial,
+        ),
+        "tiles",
+    )
+    if not query:
+        return None
+
+    try:
+        conn = get_db_connection(read_only=True)
+        cursor = execute_query(conn, query, dictionary=False)
+        column_names = [column[0] for column in cursor.description]
+        encoders = get_column_encoders(cursor.description)
+        lat_index = column_names.index("latitude")
+        lon_index = column_names.index("longitude")
+
+        features = []
+        for values in encode_row_batch(cursor.fetchall(), encoders):
+            properties = {
+                name: value
+                for index, (name, value) in enumerate(zip(column_names, values))
+                if index not in (lat_index, lon_index)
+            }
+            features.append((values[lon_index], values[lat_index], properties))
+    except QueryTimeoutError:
+        raise
+    except mysql.connector.Error as err:
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (get_vector_tile):{Font_Colors.ENDC} {str(err)}"
+        )
+        return None
+    finally:
+        if "conn" in locals() and conn:
+            conn.close()
+
+    tile = encode_tile([encode_point_layer(data_request, features, z, x, y)])
+    # A tile larger than the whole cache is served without being cached
+    if len(tile) <= Config.TILE_CACHE_MAX_BYTES:
+        with tile_cache_lock:
+            tile_cache[cache_key] = tile
+    return tile
+
+
+# Simplified zipcode boundary features per zoom band, rebuilt when the zipcode_geo checksum changes
+zip_geo_state = {"checksum": None, "checked_at": 0.0, "bands": []}
+zip_geo_lock = threading.Lock()
+# Gzipped FeatureCollections, keyed by checksum, zoom band and zipcode set
+zip_geo_cache = LRUCache(maxsize=Config.ZIP_GEO_CACHE_SIZE)
+
+
+def get_zipcode_bands() -> Tuple[Optional[int], List[dict]]:
+    """
+    Get the serialized zipcode boundary features for every zoom band.
+    The zipcode_geo checksum is re-read at most every Config.DATA_VERSION_TTL seconds and the boundaries are only
+    reloaded and simplified again when it changes.
+
+    Returns:
+        Tuple[Optional[int], List[dict]]: The table checksum and one {zipcode: Feature bytes} mapping per zoom band,
+        or the last loaded boundaries if the database cannot be reached.
+    """
+
+    now = time.monotonic()
+    with zip_geo_lock:
+        if now - zip_geo_state["checked_at"] < Config.DATA_VERSION_TTL:
+            return zip_geo_state["checksum"], zip_geo_state["bands"]
+
+    try:
+        conn = get_db_connection(read_only=True)
+        cursor = conn.cursor()
+        cursor.execute("CHECKSUM TABLE zipcode_geo")
+        (_, checksum) = cursor.fetchone()
+        cursor.close()
+
+        if checksum != zip_geo_state["checksum"]:
+            cursor = execute_query(
+                conn,
+                SQLQuery("SELECT zipcode, ST_AsGeoJSON(boundary) FROM zipcode_geo"),
+                dictionary=False,
+            )
+            bands = build_zipcode_features(cursor.fetchall())
+            with zip_geo_lock:
+                zip_geo_state["checksum"] = checksum
+                zip_geo_state["bands"] = bands
+                zip_geo_cache.clear()
+
+        with zip_geo_lock:
+            zip_geo_state["checked_at"] = now
+    except mysql.connector.Error as err:
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (get_zipcode_bands):{Font_Colors.ENDC} {str(err)}"
+        )
+    finally:
+        if "conn" in locals() and conn:
+            conn.close()
+
+    return zip_geo_state["checksum"], zip_geo_state["bands"]
+
+
+def get_zip_geo(zipcodes: List[str], zoom: Optional[int] = None) -> Tuple[bytes, str]:
+    """
+    Get a gzipped GeoJSON FeatureCollection of zipcode boundaries, simplified for the zoom level.
+    Each zipcode set is compressed once and then served from memory until zipcode_geo changes.
+
+    Args:
+        zipcodes (List[str]): The zipcodes to include. Unknown zipcodes are skipped.
+        zoom (Optional[int], optional): The client's map zoom level, or None for full resolution.
+
+    Returns:
+        Tuple[bytes, str]: The gzipped FeatureCollection and its ETag.
+    """
+
+    checksum, bands = get_zipcode_bands()
+    band = zoom_band(zoom)
+    cache_key = (checksum, band, tuple(sorted(set(zipcodes))))
+
+    with zip_geo_lock:
+        cached = zip_geo_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    features = bands[band] if bands else {}
+    body = build_feature_collection(
+        features[zipcode] for zipcode in cache_key[2] if zipcode in features
+    )
+    etag = build_cache_key(request="zip_geo", checksum=checksum, band=band, zipcodes=cache_key[2])
+    entry = (gzip.compress(body), etag)
+    with zip_geo_lock:
+        zip_geo_cache[cache_key] = entry
+    return entry
+
+
+def zip_geo_response(request_zipcode: str, zoom: str = "") -> Response:
+    """
+    Build the response for a zip_geo request from the in-memory zipcode boundaries.
+    The body is sent gzipped as stored when the client accepts it, and revalidates with If-None-Match.
+
+    Args:
+        request_zipcode (str): Comma-separated list of zipcodes.
+        zoom (str, optional): The client's map zoom level; full resolution when empty.
+
+    Returns:
+        Response: The GeoJSON FeatureCollection response, or a 400 error response.
+    """
+
+    zipcodes = [z.strip().strip("'") for z in request_zipcode.split(",") if z.strip()]
+    if not zipcodes:
+        return jsonify({"✖ Error": "Missing zipcode parameter"}), 400
+    try:
+        zoom_level = int(zoom) if zoom else None
+    except ValueError:
+        return jsonify({"✖ Error": "Invalid zoom parameter"}), 400
+
+    body, etag = get_zip_geo(zipcodes, zoom_level)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif "gzip" in request.accept_encodings:
+        response = Response(body, mimetype="application/geo+json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(gzip.decompress(body), mimetype="application/geo+json")
+
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = f"public, max-age={Config.ZIP_GEO_MAX_AGE}"
+    return response
+
+
+def json_query_results(query: SQLQuery, page: Optional[PageCursor] = None) -> Optional[Response]:
     """
     Execute a database query and return results as JSON.
+    Rows are fetched as tuples and serialized by the app's JSON provider in one call, instead of building a dict per
+    row in the cursor.
     
     Args:
-        query (str): The SQL query to execute.
+        query (SQLQuery): The SQL query to execute.
+        page (Optional[PageCursor], optional): Collects the continuation token of a paginated query.
     
     Returns:
         Optional[Response]: A Flask Response object containing the JSON results, or None if an error occurs.
@@ -816,144 +1935,658 @@ def json_query_results(query: str) -> Optional[Response]:
     Raises:
         mysql.connector.Error: If there is an error executing the query or connecting to the database.
     """
+    conn = None
+    completed = False
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
+        conn = get_db_connection(read_only=True)
+        cursor = execute_query(conn, query, dictionary=False)
         result = cursor.fetchall()
-        return jsonify(result) if result else None
+        completed = True
+        if page is not None:
+            page.observe(result, cursor.description)
+        if not result:
+            return None
+        return app.response_class(
+            app.json.dumps_rows([column[0] for column in cursor.description], result),
+            mimetype=app.json.mimetype,
+        )
+    except QueryTimeoutError:
+        raise
     except mysql.connector.Error as err:
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
         print(
             f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (json_query_results):{Font_Colors.ENDC} {str(err)}"
         )
         return None
     finally:
-        if "cursor" in locals() and cursor:
-            cursor.close()
-        if "conn" in locals() and conn:
+        if conn:
+            if not completed:
+                discard_query(conn, query, dictionary=False)
+            conn.close()
+
+
+def stream_query_results(
+    query: SQLQuery, page: Optional[PageCursor] = None
+) -> Generator[str, None, bool]:
+    """
+    Execute a database query and stream results as a JSON array.
+    Rows are read from an unbuffered cursor in batches of Config.STREAM_BATCH_SIZE and each batch is encoded and
+    yielded as one chunk, so memory stays bounded and the first bytes go out before the query finishes.
+    
+    Args:
+        query (SQLQuery): The SQL query to execute.
+        page (Optional[PageCursor], optional): Collects the continuation token of a paginated query; the page is
+            read in one batch so the token is known before the first chunk.
+    
+    Returns:
+        Generator[str, None, bool]: A generator that yields JSON text, one chunk per batch of rows, and returns True if all rows were sent.
+    
+    Raises:
+        mysql.connector.Error: If there is an error executing the query or connecting to the database.
+    """
+
+    conn = None
+    completed = False
+    separator = "[\n"
+    try:
+        conn = get_db_connection(read_only=True)
+        cursor = execute_query(conn, query, dictionary=False)
+
+        column_names = [column[0] for column in cursor.description]
+        encoders = get_column_encoders(cursor.description)
+        encode_json = json.JSONEncoder().encode
+
+        # The array is opened with the first batch, so a time limit hit before any row is read still reaches the
+        # route as QueryTimeoutError
+        while True:
+            rows = cursor.fetchmany(page.limit if page else Config.STREAM_BATCH_SIZE)
+            if not rows:
+                break
+            if page is not None:
+                page.observe(rows, cursor.description)
+
+            chunk = ",\n".join(
+                encode_json(dict(zip(column_names, values)))
+                for values in encode_row_batch(rows, encoders)
+            )
+            yield separator + chunk
+            separator = ",\n"
+
+        completed = True
+
+        # Close the JSON structure, opening it too when the query returned no rows
+        yield ("[\n" if separator == "[\n" else "") + "\n]"
+    except QueryTimeoutError:
+        raise
+    except mysql.connector.Error as err:
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (stream_query_results):{Font_Colors.ENDC} {str(err)}"
+        )
+        if separator == "[\n":
+            yield "[]\n"  # Return empty array on error, unless rows were already sent
+    finally:
+        if conn:
+            if not completed:
+                discard_query(conn, query, dictionary=False, kill=True)
+            conn.close()
+
+    return completed
+
+
+def csv_query_results(
+    query: SQLQuery, page: Optional[PageCursor] = None
+) -> Generator[str, None, bool]:
+    """
+    Execute a database query and stream results as CSV.
+    The header is yielded first, then one chunk of CSV text per batch of Config.STREAM_BATCH_SIZE rows read from an
+    unbuffered cursor, so memory stays flat regardless of the size of the export.
+    
+    Args:
+        query (SQLQuery): The SQL query to execute.
+        page (Optional[PageCursor], optional): Collects the continuation token of a paginated query; the page is
+            read in one batch so the token is known before the first chunk.
+    
+    Returns:
+        Generator[str, None, bool]: A generator that yields CSV text, one chunk per batch of rows, and returns True if all rows were sent.
+    
+    Raises:
+        mysql.connector.Error: If there is an error executing the query or connecting to the database.
+    """
+    
+    conn = None
+    completed = False
+    try:
+        conn = get_db_connection(read_only=True)
+        cursor = execute_query(conn, query, dictionary=False)
+
+        # A single buffer is reused for every batch
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([desc[0] for desc in cursor.description])
+
+        while True:
+            rows = cursor.fetchmany(page.limit if page else Config.STREAM_BATCH_SIZE)
+            if not rows:
+                break
+            if page is not None:
+                page.observe(rows, cursor.description)
+
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+        completed = True
+
+        # Header only, when the query returned no rows
+        if buffer.tell():
+            yield buffer.getvalue()
+    except QueryTimeoutError:
+        raise
+    except mysql.connector.Error as err:
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
+        print(
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (csv_query_results):{Font_Colors.ENDC} {str(err)}"
+        )
+    finally:
+        if conn:
+            if not completed:
+                discard_query(conn, query, dictionary=False, kill=True)
             conn.close()
 
+    return completed
 
-def stream_query_results(query: str) -> Generator[str, None, None]:
+
+class ChunkSink(io.RawIOBase):
     """
-    Execute a database query and stream results as JSON.
-    This function yields JSON strings for each row in the result set, allowing for efficient streaming of large datasets.
-    
+    Write-only file object that collects the bytes written by an Arrow writer so they can be yielded as chunks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def columnar_query_results(
+    query: SQLQuery, output_type: str = "arrow", page: Optional[PageCursor] = None
+) -> Generator[bytes, None, bool]:
+    """
+    Execute a database query and stream results as Arrow IPC or Parquet.
+    Each batch of Config.STREAM_BATCH_SIZE rows read from an unbuffered cursor becomes one Arrow record batch
+    (or one Parquet row group), with typed timestamp and float columns.
+
     Args:
-        query (str): The SQL query to execute.
-    
+        query (SQLQuery): The SQL query to execute.
+        output_type (str, optional): "arrow" for the Arrow IPC stream format or "parquet" (default is "arrow").
+        page (Optional[PageCursor], optional): Collects the continuation token of a paginated query; the page is
+            read in one batch so the token is known before the first chunk.
+
     Returns:
-        Generator[str, None, None]: A generator that yields JSON strings for each row in the result set.
-    
+        Generator[bytes, None, bool]: A generator that yields the encoded file, one chunk per batch of rows, and returns True if all rows were sent.
+
     Raises:
         mysql.connector.Error: If there is an error executing the query or connecting to the database.
     """
 
     conn = None
-    cursor = None
+    completed = False
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
+        conn = get_db_connection(read_only=True)
+        cursor = execute_query(conn, query, dictionary=False)
+
+        schema = get_arrow_schema(cursor.description)
+        # Decimals are converted to float before they are handed to Arrow
+        decimal_encoders = [
+            (index, float)
+            for index, column in enumerate(cursor.description)
+            if column[1] in (FieldType.DECIMAL, FieldType.NEWDECIMAL)
+        ]
+
+        sink = ChunkSink()
+        if output_type == "parquet":
+            writer = pq.ParquetWriter(sink, schema)
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+
+        # The schema goes out with the first batch, so a time limit hit before any row is read still reaches the
+        # route as QueryTimeoutError
+        while True:
+            rows = cursor.fetchmany(page.limit if page else Config.STREAM_BATCH_SIZE)
+            if not rows:
+                break
+            if page is not None:
+                page.observe(rows, cursor.description)
+
+            columns = zip(*encode_row_batch(rows, decimal_encoders))
+            batch = pa.record_batch(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            yield sink.drain()
 
-        yield "[\n"
-        first_row = True
-        for row in cursor:
-            if not first_row:
-                yield ",\n"
-            else:
-                first_row = False
-
-            # Convert mysql objects to something json-friendly
-            processed_row = {}
-            for key, value in row.items():
-                if hasattr(value, "isoformat"):
-                    processed_row[key] = value.isoformat()
-                elif isinstance(value, decimal.Decimal):
-                    processed_row[key] = float(value)
-                else:
-                    processed_row[key] = value
-            yield json.dumps(processed_row)
-
-        # Close the JSON structure
-        yield "\n]"
+        completed = True
+
+        writer.close()
+        yield sink.drain()
+    except QueryTimeoutError:
+        raise
     except mysql.connector.Error as err:
+        if err.errno == ER_QUERY_TIMEOUT:
+            raise query_timeout_error(err, query) from err
         print(
-            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (stream_query_results):{Font_Colors.ENDC} {str(err)}"
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (columnar_query_results):{Font_Colors.ENDC} {str(err)}"
         )
-        yield "[]\n"  # Return empty array on error
     finally:
-        if cursor:
-            cursor.close()
         if conn:
+            if not completed:
+                discard_query(conn, query, dictionary=False, kill=True)
             conn.close()
 
+    return completed
 
-def csv_query_results(query: str) -> Optional[io.StringIO]:
+
+def analytics_query_results(query: SQLQuery, output_type: str = ""):
     """
-    Execute a database query and return results as CSV in a StringIO object.
-    
+    Execute a columnar engine query against the Parquet snapshots and return results in the specified format.
+    Aggregate results are small, so the whole Arrow table is converted at once instead of batch by batch.
+
     Args:
-        query (str): The SQL query to execute.
-    
+        query (SQLQuery): The DuckDB query to execute.
+        output_type (str): "stream", "csv", "json", "arrow", "parquet", or "" (default is "json").
+
     Returns:
-        Optional[io.StringIO]: A StringIO object containing the CSV results, or None if an error occurs.
-    
-    Raises:
-        mysql.connector.Error: If there is an error executing the query or connecting to the database.
+        Union[Generator[str, None, bool], Generator[bytes, None, bool], Optional[Response]]: The query results in the
+        same form as the MySQL result functions.
     """
-    
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
-
-        fieldnames = [desc[0] for desc in cursor.description]
-        result = io.StringIO()
-        writer = csv.DictWriter(result, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in cursor:
-            writer.writerow(row)
-        return result
-    except mysql.connector.Error as err:
+        table = columnar_engine.execute(query.sql, query.params)
+    except ColumnarEngineError as err:
         print(
-            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in database connection (csv_query_results):{Font_Colors.ENDC} {str(err)}"
+            f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error in columnar engine (analytics_query_results):{Font_Colors.ENDC} {str(err)}"
         )
-        return None
-    finally:
-        if "cursor" in locals() and cursor:
-            cursor.close()
-        if "conn" in locals() and conn:
-            conn.close()
+        table = None
+
+    if output_type == "json" or output_type == "":
+        rows = table.to_pylist() if table is not None else []
+        return jsonify(rows) if rows else None
+
+    def chunks():
+        if table is None:
+            if output_type == "stream":
+                yield "[]\n"  # Return empty array on error
+            return False
+
+        if output_type == "stream":
+            encode_json = json.JSONEncoder().encode
+            yield "[\n" + ",\n".join(encode_json(row) for row in table.to_pylist()) + "\n]"
+        elif output_type == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(table.column_names)
+            writer.writerows(zip(*table.to_pydict().values()))
+            yield buffer.getvalue()
+        else:
+            sink = ChunkSink()
+            if output_type == "parquet":
+                writer = pq.ParquetWriter(sink, table.schema)
+            else:
+                writer = pa.ipc.new_stream(sink, table.schema)
+            writer.write_table(table)
+            writer.close()
+            yield sink.drain()
+        return True
+
+    return chunks()
 
 
-def get_query_results(query: str, output_type: str = ""):
+def get_query_results(
+    query: SQLQuery, output_type: str = "", page: Optional[PageCursor] = None
+):
     """
     Execute a database query and return results in the specified format.
 
     Args:
-        query (str): The SQL query to execute.
-        output_type (str): The format of the output. Can be "stream", "csv", "json", or "" (default is "json").
+        query (SQLQuery): The SQL query to execute.
+        output_type (str): The format of the output. Can be "stream", "csv", "json", "arrow", "parquet", or "" (default is "json").
+        page (Optional[PageCursor], optional): Collects the continuation token of a paginated query.
     
     Returns:
-        Union[Generator[str, None, None], io.StringIO, Response]: The query results in the specified format.
+        Union[Generator[str, None, None], Generator[bytes, None, None], Response]: The query results in the specified format.
     
     Raises:
         ValueError: If the output_type is not recognized.
     """
 
-    if output_type == "stream":
-        return stream_query_results(query)
+    if query.engine == "duckdb" and (output_type in OUTPUT_TYPE_RESPONSES or output_type == ""):
+        return analytics_query_results(query, output_type=output_type)
+    elif output_type == "stream":
+        return stream_query_results(query, page=page)
     elif output_type == "csv":
-        return csv_query_results(query)
+        return csv_query_results(query, page=page)
+    elif output_type == "arrow" or output_type == "parquet":
+        return columnar_query_results(query, output_type=output_type, page=page)
     elif output_type == "json" or output_type == "":
-        return json_query_results(query)
+        return json_query_results(query, page=page)
     else:
         raise ValueError(
             f"{Font_Colors.FAIL}{Font_Colors.BOLD}✖ Error getting query results:{Font_Colors.ENDC} Invalid output_type: {output_type}"
         )
 
 
+def start_stream(chunks: Generator) -> Generator:
+    """
+    Run a streamed query up to its first chunk, so errors raised while executing it (such as QueryTimeoutError)
+    reach the route before the response status is sent.
+
+    Args:
+        chunks (Generator): A streaming generator from get_query_results.
+
+    Returns:
+        Generator: A generator that yields the same chunks and returns the same value.
+    """
+
+    try:
+        first_chunk = next(chunks)
+    except StopIteration as stop:
+        first_chunk = None
+        completed = stop.value
+
+    def resumed():
+        if first_chunk is None:
+            return completed
+        try:
+            yield first_chunk
+            return (yield from chunks)
+        finally:
+            chunks.close()
+
+    return resumed()
+
+
+def build_data_query(
+    data_request: str,
+    request_options: str = "",
+    request_date: str = "",
+    request_zipcode: str = "",
+    event_ids: str = "",
+    is_spatial: bool = False,
+    after_id: str = "",
+    limit: int = 0,
+    bucket: str = "",
+    resolution: int = 0,
+    since: str = "",
+) -> Optional[SQLQuery]:
+    """
+    Validate the parameters of a /data/query request and build its query with the request type's time limit.
+
+    Args:
+        data_request (str): The type of data request (e.g., "311_by_geo", "911_shots_fired").
+        request_options (str, optional): Comma-separated list of 311 categories.
+        request_date (str, optional): Date in "YYYY-MM" format.
+        request_zipcode (str, optional): Comma-separated list of zipcodes.
+        event_ids (str, optional): Comma-separated list of 311 event IDs.
+        is_spatial (bool, optional): Whether to restrict to the spatial area of interest.
+        after_id (str, optional): Keyset pagination position.
+        limit (int, optional): Page size, 0 for no pagination.
+        bucket (str, optional): Time series bucket ("day", "week", "month" or "quarter").
+        resolution (int, optional): Grid geohash length, 0 for the default.
+        since (str, optional): Watermark from a previous response's X-Watermark header, to only return changed rows.
+
+    Returns:
+        Optional[SQLQuery]: The query, or None if it could not be built.
+
+    Raises:
+        ValueError: If a required parameter is missing or invalid, or the request type is not recognized.
+    """
+
+    if data_request.startswith("311_by") and not request_options:
+        raise ValueError("Missing required options parameter for 311 request")
+
+    if data_request.startswith("311_on_date") and not request_date:
+        raise ValueError("Missing required options parameter for 311 request")
+
+    # Validate date format for date-specific queries
+    if request_date and not check_date_format(request_date):
+        raise ValueError('Incorrect date format. Expects "YYYY-MM"')
+
+    if bucket and bucket not in SQLConstants.TIME_BUCKETS:
+        raise ValueError(
+            f"Invalid bucket parameter, expects one of {', '.join(SQLConstants.TIME_BUCKETS)}"
+        )
+
+    if resolution and resolution not in GRID_RESOLUTIONS:
+        raise ValueError(
+            f"resolution must be between {GRID_RESOLUTIONS[0]} and {GRID_RESOLUTIONS[-1]}"
+        )
+
+    since_watermark = None
+    if since:
+        if data_request not in DELTA_REQUESTS:
+            raise ValueError(f"since is not supported for {data_request}")
+        try:
+            since_watermark = datetime.datetime.fromisoformat(since)
+        except ValueError:
+            raise ValueError(f"Invalid since parameter: {since}")
+
+    if data_request.startswith("311"):
+        query = build_311_query(
+            data_request=data_request,
+            request_options=request_options,
+            request_date=request_date,
+            request_zipcode=request_zipcode,
+            event_ids=event_ids,
+            is_spatial=is_spatial,
+            after_id=after_id,
+            limit=limit,
+            bucket=bucket,
+            resolution=resolution,
+            since=since_watermark,
+        )
+    elif data_request.startswith("911"):
+        query = build_911_query(
+            data_request=data_request,
+            is_spatial=is_spatial,
+            after_id=after_id,
+            limit=limit,
+            request_date=request_date,
+            bucket=bucket,
+            resolution=resolution,
+            since=since_watermark,
+        )
+    else:
+        raise ValueError("Invalid data_request parameter")
+
+    # Aggregates are answered from the Parquet snapshots when the columnar engine has them; point lookups stay on MySQL
+    if (
+        query is not None
+        and columnar_engine is not None
+        and data_request in Config.COLUMNAR_REQUESTS
+        and not event_ids
+        and columnar_engine.available()
+    ):
+        columnar_query = build_columnar_query(
+            data_request=data_request,
+            request_options=request_options,
+            month_range=get_month_range(request_date) if request_date else (),
+            is_spatial=is_spatial,
+            bucket=bucket,
+        )
+        if columnar_query is not None:
+            return SQLQuery(*columnar_query, engine="duckdb")
+
+    return with_query_timeout(query, data_request)
+
+
+def build_data_query_cache_key(
+    data_request: str,
+    request_options: str = "",
+    request_date: str = "",
+    request_zipcode: str = "",
+    event_id_list: Optional[List[int]] = None,
+    is_spatial: bool = False,
+    output_type: str = "json",
+    after_id: str = "",
+    limit: int = 0,
+    bucket: str = "",
+    resolution: int = 0,
+    since: str = "",
+) -> str:
+    """
+    Build the response cache key and ETag of a /data/query request.
+    Responses only change when new data is ingested, so the data version replaces any TTL.
+
+    Args:
+        data_request (str): The type of data request.
+        request_options (str, optional): Comma-separated list of 311 categories.
+        request_date (str, optional): Date in "YYYY-MM" format.
+        request_zipcode (str, optional): Comma-separated list of zipcodes.
+        event_id_list (Optional[List[int]], optional): Parsed 311 event IDs.
+        is_spatial (bool, optional): Whether the request is restricted to the spatial area of interest.
+        output_type (str, optional): The response format.
+        after_id (str, optional): Keyset pagination position.
+        limit (int, optional): Page size.
+        bucket (str, optional): Time series bucket.
+        resolution (int, optional): Grid geohash length.
+        since (str, optional): Delta query watermark.
+
+    Returns:
+        str: The cache key.
+    """
+
+    return build_cache_key(
+        request=data_request,
+        category=request_options,
+        date=request_date,
+        zipcode=",".join(
+            sorted(z.strip() for z in request_zipcode.split(",") if z.strip())
+        ),
+        event_ids=sorted(event_id_list or []),
+        is_spatial=is_spatial,
+        output_type=output_type,
+        after_id=after_id,
+        limit=limit,
+        bucket=bucket,
+        resolution=resolution,
+        since=since,
+        data_version=get_data_version(),
+    )
+
+
+def run_batch_request(params: dict) -> Tuple[int, bytes]:
+    """
+    Run one request of a /data/query/batch call on its own pooled connection.
+    Results are read from and stored in the same response cache as /data/query with output_type=json.
+
+    Args:
+        params (dict): The request's /data/query parameters ("request", "category", "date", "zipcode",
+            "event_ids", "is_spatial", "bucket", "resolution", and "zoom" for zip_geo).
+
+    Returns:
+        Tuple[int, bytes]: The HTTP status of the request and its JSON body (the results or an error object).
+    """
+
+    def error(status: int, message: str) -> Tuple[int, bytes]:
+        return status, json.dumps({"✖ Error": message}).encode("utf-8")
+
+    data_request = str(params.get("request", ""))
+    request_zipcode = str(params.get("zipcode", ""))
+    event_ids = params.get("event_ids", "")
+    if isinstance(event_ids, list):
+        event_ids = ",".join(str(event_id) for event_id in event_ids)
+    is_spatial = str(params.get("is_spatial", "0")).lower() in ("true", "1", "yes")
+    bucket = str(params.get("bucket", ""))
+    resolution = str(params.get("resolution", ""))
+
+    if not data_request:
+        return error(400, "Missing data_request parameter")
+    if resolution and not resolution.isdigit():
+        return error(400, "Invalid resolution parameter")
+    if any(params.get(name) for name in ("after_id", "cursor", "limit", "since")):
+        return error(400, "Pagination and since are not supported in batch requests")
+
+    try:
+        with app.app_context():
+            if data_request == "zip_geo":
+                zipcodes = [
+                    z.strip().strip("'") for z in request_zipcode.split(",") if z.strip()
+                ]
+                if not zipcodes:
+                    return error(400, "Missing zipcode parameter")
+                zoom = str(params.get("zoom", ""))
+                if zoom and not zoom.isdigit():
+                    return error(400, "Invalid zoom parameter")
+                body, _ = get_zip_geo(zipcodes, int(zoom) if zoom else None)
+                return 200, gzip.decompress(body)
+
+            event_id_list = parse_event_ids(event_ids) if event_ids else []
+            query = build_data_query(
+                data_request=data_request,
+                request_options=str(params.get("category", "")),
+                request_date=str(params.get("date", "")),
+                request_zipcode=request_zipcode,
+                event_ids=event_ids,
+                is_spatial=is_spatial,
+                bucket=bucket,
+                resolution=int(resolution or 0),
+            )
+            if not query:
+                return error(500, "Failed to build query")
+
+            cache_key = build_data_query_cache_key(
+                data_request=data_request,
+                request_options=str(params.get("category", "")),
+                request_date=str(params.get("date", "")),
+                request_zipcode=request_zipcode,
+                event_id_list=event_id_list,
+                is_spatial=is_spatial,
+                bucket=bucket,
+                resolution=int(resolution or 0),
+            )
+            cached = response_cache.get(cache_key)
+            if cached:
+                return 200, cached.body
+
+            response = get_query_results(query, "json")
+            if response is None:
+                return error(500, "No results or database error")
+            body = response.get_data()
+            response_cache.set(cache_key, CachedResponse(body, "application/json", {}))
+            return 200, body
+
+    except ValueError as e:
+        return error(400, str(e))
+    except QueryTimeoutError as e:
+        return error(504, f"Query timed out, try a narrower request ({e.msg})")
+    except Exception as e:
+        return error(500, str(e))
+
+
 def get_gemini_response(
     prompt: str, cache_name: str, structured_response: bool = False
 ) -> str:
@@ -1085,13 +2718,13 @@ def create_gemini_context(
         ):
 
             files_list = get_files("txt")
-            query = build_311_query(
+            query = build_data_query(
                 data_request="311_summary_context", is_spatial=is_spatial
             )
 
             response = get_query_results(query=query, output_type="csv")
 
-            content["parts"].append({"text": response.getvalue()})
+            content["parts"].append({"text": "".join(response)})
 
             preamble_file = context_request + ".txt"
 
@@ -1288,6 +2921,43 @@ def check_session():
     g.log_entry = None
 
 
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """
+    Middleware to compress responses with the best encoding the client accepts.
+    Streamed responses are compressed chunk by chunk as they are sent; buffered responses are compressed when they
+    are at least Config.COMPRESSION_MIN_SIZE bytes. ETags are made weak, so If-None-Match still matches them.
+    """
+    if (
+        not Config.COMPRESSION_ENABLED
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress_body(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
 #
 # Endpoint Definitions
 #
@@ -1319,83 +2989,126 @@ def route_data_query():
     data_request = request.args.get("request", "")
     output_type = request.args.get("output_type", "")
     is_spatial = request.args.get("is_spatial", "0") in ("true", "1", "yes")
+    after_id = request.args.get("after_id", "")
+    page_cursor = request.args.get("cursor", "")
+    limit = request.args.get("limit", "")
+    bucket = request.args.get("bucket", "")
+    resolution = request.args.get("resolution", "")
+    since = request.args.get("since", "")
 
     if not data_request:
         return jsonify({"✖ Error": "Missing data_request parameter"}), 400
 
-    if request.method == "POST":
-        # Handles case for requesting many event_ids
-        data = request.get_json()
-        event_ids = data.get("event_ids", "")
+    if resolution and not resolution.isdigit():
+        return jsonify({"✖ Error": "Invalid resolution parameter"}), 400
+    resolution = int(resolution or 0)
 
-    try:  # Get and validate request parameters
-        request_options = request.args.get("category", "")
-        if data_request.startswith("311_by") and not request_options:
+    # Validate pagination parameters
+    if after_id or page_cursor or limit:
+        if data_request not in PAGINATED_REQUESTS:
             return (
-                jsonify(
-                    {"✖ Error": "Missing required options parameter for 311 request"}
-                ),
+                jsonify({"✖ Error": f"Pagination is not supported for {data_request}"}),
                 400,
             )
-
-        if data_request.startswith("311_on_date") and not request_date:
+        try:
+            if page_cursor:
+                after_id = decode_page_cursor(page_cursor)
+            limit = int(limit) if limit else 0
+        except ValueError:
+            return jsonify({"✖ Error": "Invalid cursor or limit parameter"}), 400
+        if data_request in NUMERIC_ID_REQUESTS and after_id and not after_id.isdigit():
+            return jsonify({"✖ Error": "Invalid after_id parameter, expects a numeric id"}), 400
+        if not 0 <= limit <= Config.MAX_PAGE_SIZE:
             return (
-                jsonify(
-                    {"✖ Error": "Missing required options parameter for 311 request"}
-                ),
+                jsonify({"✖ Error": f"limit must be between 0 and {Config.MAX_PAGE_SIZE}"}),
                 400,
             )
+    else:
+        limit = 0
 
-        # Validate date format for date-specific queries
-        if data_request.startswith("311_on_date") and not check_date_format(
-            request_date
-        ):
-            return jsonify({"✖ Error": 'Incorrect date format. Expects "YYYY-MM"'}), 400
+    if request.method == "POST":
+        # Handles case for requesting many event_ids
+        data = request.get_json()
+        event_ids = data.get("event_ids", "")
+
+    try:
+        event_id_list = parse_event_ids(event_ids) if event_ids else []
+    except ValueError as e:
+        return jsonify({"✖ Error": str(e)}), 400
+
+    try:  # Get and validate request parameters
+        request_options = request.args.get("category", "")
+        if data_request == "zip_geo":
+            return zip_geo_response(request_zipcode, request.args.get("zoom", ""))
 
         # Build query using the appropriate query builder
-        if data_request.startswith("311"):
-            query = build_311_query(
+        try:
+            query = build_data_query(
                 data_request=data_request,
                 request_options=request_options,
                 request_date=request_date,
                 request_zipcode=request_zipcode,
                 event_ids=event_ids,
                 is_spatial=is_spatial,
+                after_id=after_id,
+                limit=limit,
+                bucket=bucket,
+                resolution=resolution,
+                since=since,
             )
-
-        elif data_request.startswith("911"):
-            query = build_911_query(data_request=data_request, is_spatial=is_spatial)
-        elif data_request == "zip_geo":
-            query = f"""
-            SELECT JSON_OBJECT(
-                'type', 'FeatureCollection',
-                'features', JSON_ARRAYAGG(
-                    JSON_OBJECT(
-                        'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(boundary),
-                        'properties', JSON_OBJECT('zipcode', zipcode)
-                    )
-                )
-            )
-            FROM zipcode_geo
-            WHERE zipcode IN ({request_zipcode})
-            """
-        else:
-            return jsonify({"✖ Error": "Invalid data_request parameter"}), 400
+        except ValueError as e:
+            return jsonify({"✖ Error": str(e)}), 400
 
         if not query:
             return jsonify({"✖ Error": "Failed to build query"}), 500
 
-        # Return w/ streaming
+        # The deprecated stream=True flag overrides output_type
         if stream_result == "True":
-            # return Response(stream_with_context(stream_query_results(query=query)), mimetype="application/json")
-            return Response(
-                stream_with_context(
-                    get_query_results(query=query, output_type="stream")
-                ),
-                mimetype="application/json",
+            output_type = "stream"
+        elif not output_type:
+            output_type = "json"
+
+        if output_type not in OUTPUT_TYPE_RESPONSES:
+            return jsonify({"✖ Error": f"Invalid output_type: {output_type}"}), 400
+        mimetype, headers = OUTPUT_TYPE_RESPONSES[output_type]
+
+        cache_key = build_data_query_cache_key(
+            data_request=data_request,
+            request_options=request_options,
+            request_date=request_date,
+            request_zipcode=request_zipcode,
+            event_id_list=event_id_list,
+            is_spatial=is_spatial,
+            output_type=output_type,
+            after_id=after_id,
+            limit=limit,
+            bucket=bucket,
+            resolution=resolution,
+            since=since,
+        )
+        if data_request in DELTA_REQUESTS:
+            # Clients send this back as since= to only fetch rows changed after this response
+            headers = {**headers, "X-Watermark": get_data_watermark()}
+
+        cached = response_cache.get(cache_key)
+        if request.if_none_match.contains_weak(cache_key):
+            response = Response(status=304)
+        elif cached:
+            response = Response(
+                cached.body, mimetype=cached.mimetype, headers=cached.headers
+            )
+        elif output_type == "json":
+            page = PageCursor(limit) if limit else None
+            response = get_query_results(query=query, output_type=output_type, page=page)
+            if page is not None:
+                headers = {**headers, "X-Next-Cursor": page.token}
+            if response is None:
+                # No rows or a database error, nothing to cache
+                return response
+            response.headers.update(headers)
+            response_cache.set(
+                cache_key, CachedResponse(response.get_data(), mimetype, headers)
             )
-        # Return non-streaming
         else:
             # log_event(
             #     session_id=session_id,
@@ -1403,16 +3116,39 @@ def route_data_query():
             #     log_id=g.log_entry,
             #     app_response="SUCCESS",
             # )
-            result = get_query_results(query=query, output_type=output_type)
-            if output_type == "csv" and result:
-                output = result.getvalue()
-                response = Response(output, mimetype="text/csv")
-                response.headers["Content-Disposition"] = (
-                    "attachment; filename=export.csv"
-                )
-                return response
-            return result
+            page = PageCursor(limit) if limit else None
+            # Priming the stream reads the whole page, so its continuation token is known before the headers are sent
+            result = start_stream(
+                get_query_results(query=query, output_type=output_type, page=page)
+            )
+            if page is not None:
+                headers = {**headers, "X-Next-Cursor": page.token}
+            response = Response(
+                stream_with_context(
+                    cache_streamed_response(
+                        result, response_cache, cache_key, mimetype, headers
+                    )
+                ),
+                mimetype=mimetype,
+                headers=headers,
+            )
+
+        # Clients revalidate with If-None-Match and get a 304 until the next ingest
+        response.set_etag(cache_key)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
 
+    except QueryTimeoutError as e:
+        log_event(
+            session_id=session_id,
+            app_version=app_version,
+            log_id=g.log_entry,
+            app_response=f"TIMEOUT: {str(e)}",
+        )
+        return (
+            jsonify({"✖ Error": f"Query timed out, try a narrower request ({e.msg})"}),
+            504,
+        )
     except Exception as e:
         log_event(
             session_id=session_id,
@@ -1423,6 +3159,168 @@ def route_data_query():
         return jsonify({"✖ Error": str(e)}), 500
 
 
+@app.route("/data/query/batch", methods=["POST"])
+def route_data_query_batch():
+    """
+    Endpoint to run several /data/query requests in one round trip.
+    The requests run concurrently, up to Config.BATCH_MAX_WORKERS at a time, each on its own pooled connection.
+    Results are returned as one JSON object keyed by request name, or with output_type=ndjson as one JSON line per
+    request in the order the requests complete.
+
+    Args:
+        None: The request body is {"requests": {<name>: {<data/query parameters>}, ...}}.
+
+    Returns:
+        Response: The multiplexed results, each as {"status": <HTTP status>, "data": <results or error>}.
+    """
+
+    session_id = session.get("session_id")
+    app_version = request.args.get("app_version", "0")
+    output_type = request.args.get("output_type", "json")
+
+    data = request.get_json(silent=True) or {}
+    batch = data.get("requests")
+    if not isinstance(batch, dict) or not batch:
+        return jsonify({"✖ Error": "Missing requests object"}), 400
+    if len(batch) > Config.BATCH_MAX_REQUESTS:
+        return (
+            jsonify({"✖ Error": f"Too many requests, the limit is {Config.BATCH_MAX_REQUESTS}"}),
+            400,
+        )
+    if not all(isinstance(params, dict) for params in batch.values()):
+        return jsonify({"✖ Error": "Each request must be an object of parameters"}), 400
+    if output_type not in ("json", "ndjson"):
+        return jsonify({"✖ Error": f"Invalid output_type: {output_type}"}), 400
+
+    executor = ThreadPoolExecutor(max_workers=min(len(batch), Config.BATCH_MAX_WORKERS))
+    futures = {
+        executor.submit(run_batch_request, params): name for name, params in batch.items()
+    }
+
+    def log_failure(name: str, status: int, body: bytes) -> None:
+        if status >= 500:
+            log_event(
+                session_id=session_id,
+                app_version=app_version,
+                log_id=g.log_entry,
+                app_response=f"ERROR: batch request {name}: {body.decode('utf-8')}",
+            )
+
+    if output_type == "ndjson":
+
+        def frames():
+            try:
+                for future in as_completed(futures):
+                    name = futures[future]
+                    status, body = future.result()
+                    log_failure(name, status, body)
+                    yield (
+                        f'{{"id":{json.dumps(name)},"status":{status},"data":'.encode("utf-8")
+                        + body
+                        + b"}\n"
+                    )
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return Response(stream_with_context(frames()), mimetype="application/x-ndjson")
+
+    try:
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+    finally:
+        executor.shutdown(wait=False)
+
+    parts = []
+    for name in batch:
+        status, body = results[name]
+        log_failure(name, status, body)
+        parts.append(
+            f'{json.dumps(name)}:{{"status":{status},"data":'.encode("utf-8") + body + b"}"
+        )
+    return Response(b"{" + b",".join(parts) + b"}", mimetype="application/json")
+
+
+@app.route("/data/tiles/<int:z>/<int:x>/<int:y>.mvt", methods=["GET"])
+def route_data_tiles(z: int, x: int, y: int):
+    """
+    Endpoint to serve 311 and 911 incident points as Mapbox Vector Tiles.
+    Tiles are cached per data version, so repeated requests for the same tile are served from memory until the next ingest.
+
+    Args:
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row.
+
+    Returns:
+        Response: A Flask Response object containing the encoded tile (application/vnd.mapbox-vector-tile).
+
+    Raises:
+        400 Bad Request: If the tile address or request parameters are invalid.
+        500 Internal Server Error: If there is an error querying the database or encoding the tile.
+        504 Gateway Timeout: If the tile query runs past its time limit.
+    """
+
+    data_request = request.args.get("request", "311_by_geo")
+    request_options = request.args.get("category", "")
+    request_date = request.args.get("date", "")
+    is_spatial = request.args.get("is_spatial", "0") in ("true", "1", "yes")
+
+    if not is_valid_tile(z, x, y):
+        return jsonify({"✖ Error": "Invalid tile address"}), 400
+
+    if data_request not in ("311_by_geo", "911_shots_fired"):
+        return jsonify({"✖ Error": "Invalid data_request parameter"}), 400
+
+    if data_request == "311_by_geo" and (
+        request_options not in SQLConstants.CATEGORY_TYPES
+    ):
+        return (
+            jsonify({"✖ Error": "Missing required options parameter for 311 request"}),
+            400,
+        )
+
+    if request_date and not check_date_format(request_date):
+        return jsonify({"✖ Error": 'Incorrect date format. Expects "YYYY-MM"'}), 400
+
+    try:
+        tile = get_vector_tile(
+            data_request=data_request,
+            z=z,
+            x=x,
+            y=y,
+            request_options=request_options,
+            request_date=request_date,
+            is_spatial=is_spatial,
+        )
+    except QueryTimeoutError as e:
+        return (
+            jsonify({"✖ Error": f"Query timed out, try a narrower request ({e.msg})"}),
+            504,
+        )
+    if tile is None:
+        return jsonify({"✖ Error": "Failed to build tile"}), 500
+
+    response = Response(tile, mimetype="application/vnd.mapbox-vector-tile")
+    response.headers["Cache-Control"] = f"public, max-age={Config.TILE_MAX_AGE}"
+    return response
+
+
+@app.route("/metrics/db_pool", methods=["GET"])
+def route_metrics_db_pool():
+    """
+    Endpoint to report connection pool metrics, used to size the pool and the number of workers.
+    Metrics are per worker process.
+
+    Returns:
+        Response: A JSON object with the pool size, in-use, peak in-use and waiting counts, timeout, rejection and
+        reconnect counters, and checkout latency and wait time histograms in milliseconds, plus the same metrics
+        for each read replica pool under "replicas" when replicas are configured.
+    """
+    metrics = {"pid": os.getpid(), **db_pool.metrics()}
+    if replica_router is not None:
+        metrics["replicas"] = replica_router.metrics()
+    return jsonify(metrics)
+
+
 @app.route("/chat", methods=["POST"])
 def route_chat():
     """
@@ -1865,7 +3763,7 @@ def route_llm_summary():
         return jsonify({"Error"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(dictionary=True)
         cursor.execute(
             "SELECT summary FROM llm_summaries WHERE month_label = %s", (month,)
@@ -1919,7 +3817,7 @@ def route_all_llm_summaries():
     app_version = request.args.get("app_version", "0")
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor(dictionary=True)
         cursor.exebefore_requestcute(
             "SELECT month_label, summary FROM llm_summaries ORDER BY month_label ASC"
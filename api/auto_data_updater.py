@@ -17,6 +17,7 @@ sys.path.append(str(Path(__file__).parent.parent / "data_download"))
 from download_crime_data import get_crime_incident_reports, filter_shots_fired_data, filter_homicide_data
 from download_911_data import download_911_data
 from import_911_to_mysql import import_to_mysql
+from data_maintenance import run_post_ingest_maintenance
 
 # Configure logging
 logging.basicConfig(
@@ -87,6 +88,12 @@ def main():
     if update_311_data():
         success_count += 1
     
+    # Refresh derived tables (rollups, link tables) from the newly ingested data
+    if success_count > 0:
+        logging.info("🔄 Refreshing derived tables...")
+        if not run_post_ingest_maintenance():
+            logging.error("❌ Derived table refresh failed")
+    
     end_time = datetime.now()
     duration = end_time - start_time
     
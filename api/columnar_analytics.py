@@ -0,0 +1,463 @@
+"""
+columnar_analytics.py
+
+This module contains the optional columnar analytics engine used for aggregate /data/query requests.
+After each ingest, data_maintenance.py exports the raw 311 and 911 tables to Parquet snapshots; aggregate requests are
+then answered by an embedded DuckDB database scanning those snapshots, while point lookups stay on MySQL.
+The TNT polygon test is evaluated by MySQL once per row when the snapshot is written and stored as `in_spatial`, so
+no spatial extension is needed in DuckDB.
+
+DuckDB is only required when the engine is enabled (COLUMNAR_ENGINE_ENABLED).
+
+Key Components:
+- `write_parquet_snapshots`: exports the snapshot tables, replacing each file atomically.
+- `ColumnarEngine`: runs queries against the snapshots and returns Arrow tables.
+- `build_columnar_query`: DuckDB versions of the aggregate request types.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from mysql.connector.constants import FieldType
+
+from sql_constants import SQLConstants
+
+try:
+    import duckdb
+except ImportError:  # Optional, only needed when the columnar engine is enabled
+    duckdb = None
+
+# Tables exported to Parquet, and those that get the precomputed TNT polygon flag
+SNAPSHOT_TABLES = ("bos311_data", "shots_fired_data", "homicide_data")
+SPATIAL_SNAPSHOT_TABLES = ("bos311_data", "shots_fired_data")
+
+# Geometry columns cannot be stored in Parquet and are left out of the snapshots
+GEOMETRY_DATA_TYPES = (
+    "point",
+    "geometry",
+    "linestring",
+    "polygon",
+    "multipoint",
+    "multilinestring",
+    "multipolygon",
+    "geomcollection",
+    "geometrycollection",
+)
+
+# Rows read from MySQL per Parquet row group when writing a snapshot
+SNAPSHOT_BATCH_SIZE = 100000
+
+# Spatial WHERE clauses for the snapshots, the polygon test is evaluated once when the snapshot is written
+BOS311_SNAPSHOT_SPATIAL_WHERE = "in_spatial = 1"
+BOS911_SNAPSHOT_SPATIAL_WHERE = "year >= 2018 AND year < 2025 AND in_spatial = 1"
+
+# Columns of SQLConstants.BOS311_TIME_BREAKDOWN and BOS911_TIME_BREAKDOWN, cast back to integers after summing
+TIME_BREAKDOWN_COLUMNS = (
+    "total_by_year",
+    "q1_total", "q2_total", "q3_total", "q4_total",
+    "jan_total", "feb_total", "mar_total", "apr_total", "may_total", "jun_total",
+    "jul_total", "aug_total", "sep_total", "oct_total", "nov_total", "dec_total",
+)
+
+
+class ColumnarEngineError(Exception):
+    """Raised when the columnar engine fails to run a query."""
+
+
+def get_arrow_schema(description) -> pa.Schema:
+    """
+    Build an Arrow schema from the cursor description.
+    Timestamps, dates, integers and floats keep their types; decimals become float64 and everything else is a string.
+
+    Args:
+        description (list): The cursor description, one (name, type_code, ...) entry per column.
+
+    Returns:
+        pa.Schema: The Arrow schema for the result set.
+    """
+
+    integer_types = (
+        FieldType.TINY,
+        FieldType.SHORT,
+        FieldType.INT24,
+        FieldType.LONG,
+        FieldType.LONGLONG,
+        FieldType.YEAR,
+    )
+    float_types = (
+        FieldType.FLOAT,
+        FieldType.DOUBLE,
+        FieldType.DECIMAL,
+        FieldType.NEWDECIMAL,
+    )
+
+    fields = []
+    for column in description:
+        if column[1] in integer_types:
+            arrow_type = pa.int64()
+        elif column[1] in float_types:
+            arrow_type = pa.float64()
+        elif column[1] in (FieldType.DATETIME, FieldType.TIMESTAMP):
+            arrow_type = pa.timestamp("us")
+        elif column[1] in (FieldType.DATE, FieldType.NEWDATE):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column[0], arrow_type))
+    return pa.schema(fields)
+
+
+def _arrow_array(values: tuple, field: pa.Field) -> pa.Array:
+    """Convert one column of MySQL values to an Arrow array of the field's type."""
+    if pa.types.is_floating(field.type):
+        values = [None if value is None else float(value) for value in values]
+    elif pa.types.is_string(field.type):
+        values = [
+            value.decode("utf-8", "replace") if isinstance(value, (bytes, bytearray))
+            else value if value is None or isinstance(value, str)
+            else str(value)
+            for value in values
+        ]
+    return pa.array(values, type=field.type)
+
+
+def write_parquet_snapshot(conn, table: str, path: Union[str, Path]) -> int:
+    """
+    Export a table to a Parquet file, without its geometry columns and, for spatial tables, with an `in_spatial` flag.
+    The file is written under a temporary name and moved into place, so readers see either the old or the new file.
+
+    Args:
+        conn: An open MySQL connection.
+        table (str): The table to export.
+        path (Union[str, Path]): The Parquet file to write.
+
+    Returns:
+        int: The number of rows written.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            AND DATA_TYPE NOT IN ({", ".join(["%s"] * len(GEOMETRY_DATA_TYPES))})
+            ORDER BY ORDINAL_POSITION
+            """,
+            (table,) + GEOMETRY_DATA_TYPES,
+        )
+        columns = [f"`{name}`" for (name,) in cursor.fetchall()]
+        if table in SPATIAL_SNAPSHOT_TABLES:
+            columns.append(f"COALESCE(({SQLConstants.TNT_SPATIAL_FILTER}), 0) AS in_spatial")
+
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
+        schema = get_arrow_schema(cursor.description)
+
+        rows_written = 0
+        with pq.ParquetWriter(temp_path, schema) as writer:
+            while True:
+                rows = cursor.fetchmany(SNAPSHOT_BATCH_SIZE)
+                if not rows:
+                    break
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            _arrow_array(values, field)
+                            for values, field in zip(zip(*rows), schema)
+                        ],
+                        schema=schema,
+                    )
+                )
+                rows_written += len(rows)
+
+        os.replace(temp_path, path)
+        return rows_written
+    finally:
+        cursor.close()
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def write_parquet_snapshots(conn, snapshot_path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Export every snapshot table to `<snapshot_path>/<table>.parquet`.
+
+    Args:
+        conn: An open MySQL connection.
+        snapshot_path (Union[str, Path]): The snapshot directory, created if needed.
+
+    Returns:
+        Dict[str, int]: The number of rows written per table.
+    """
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.mkdir(parents=True, exist_ok=True)
+    return {
+        table: write_parquet_snapshot(conn, table, snapshot_path / f"{table}.parquet")
+        for table in SNAPSHOT_TABLES
+    }
+
+
+class ColumnarEngine:
+    """
+    Embedded DuckDB database with one view per Parquet snapshot, named after the MySQL table it was exported from.
+    Views read their file on every query, so a replaced snapshot is picked up without reloading anything.
+
+    Args:
+        snapshot_path (Union[str, Path]): The directory written by write_parquet_snapshots.
+
+    Raises:
+        ImportError: If duckdb is not installed.
+    """
+
+    def __init__(self, snapshot_path: Union[str, Path]):
+        if duckdb is None:
+            raise ImportError("The columnar engine requires duckdb (pip install duckdb)")
+        self.snapshot_path = Path(snapshot_path)
+        self._db = duckdb.connect(":memory:")
+        self._views_created = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether every snapshot has been written."""
+        return all(
+            (self.snapshot_path / f"{table}.parquet").is_file() for table in SNAPSHOT_TABLES
+        )
+
+    def _create_views(self) -> None:
+        with self._lock:
+            if self._views_created:
+                return
+            for table in SNAPSHOT_TABLES:
+                parquet_path = str(self.snapshot_path / f"{table}.parquet").replace("'", "''")
+                self._db.execute(
+                    f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{parquet_path}')"
+                )
+            self._views_created = True
+
+    def execute(self, sql: str, params: tuple = ()) -> pa.Table:
+        """
+        Run a query against the snapshots.
+
+        Args:
+            sql (str): The DuckDB query, with ? placeholders.
+            params (tuple, optional): The bound parameters.
+
+        Returns:
+            pa.Table: The result.
+
+        Raises:
+            ColumnarEngineError: If the query fails.
+        """
+        try:
+            self._create_views()
+            cursor = self._db.cursor()
+            try:
+                return cursor.execute(sql, list(params)).fetch_arrow_table()
+            finally:
+                cursor.close()
+        except duckdb.Error as e:
+            raise ColumnarEngineError(str(e)) from e
+
+
+def build_columnar_query(
+    data_request: str,
+    request_options: str = "",
+    month_range: tuple = (),
+    is_spatial: bool = False,
+    bucket: str = "",
+) -> Optional[Tuple[str, tuple]]:
+    """
+    Build the DuckDB query for an aggregate request, returning the same columns as its MySQL query.
+
+    Args:
+        data_request (str): The type of data request ("311_summary", "311_summary_context", "311_timeseries" or
+            "911_timeseries").
+        request_options (str, optional): The 311 category (e.g., "living_conditions", "all").
+        month_range (tuple, optional): (first day, first day of the next month) to limit results to one month.
+        is_spatial (bool, optional): Whether to limit results to the TNT polygon.
+        bucket (str, optional): Time series bucket ("day", "week", "month" or "quarter").
+
+    Returns:
+        Optional[Tuple[str, tuple]]: The SQL and its parameters, or None if the request is not an aggregate the engine
+        answers.
+    """
+
+    Bos311_where_clause = (
+        BOS311_SNAPSHOT_SPATIAL_WHERE if is_spatial else SQLConstants.BOS311_BASE_WHERE
+    )
+    Bos911_where_clause = (
+        BOS911_SNAPSHOT_SPATIAL_WHERE if is_spatial else SQLConstants.BOS911_BASE_WHERE
+    )
+
+    if data_request == "311_summary" and request_options:
+        date_clause = "AND open_dt >= ? AND open_dt < ?" if month_range else ""
+        query = f"""
+        SELECT
+            category,
+            subcategory,
+            total
+        FROM (
+            SELECT
+                category,
+                CASE WHEN GROUPING(type) = 1 THEN 'TOTAL' ELSE type END AS subcategory,
+                COUNT(*) AS total,
+                GROUPING(type) AS is_total
+            FROM (
+                SELECT
+                    normalized_type AS category,
+                    type
+                FROM bos311_data
+                WHERE
+                    {SQLConstants.CATEGORY_FILTERS[request_options]}
+                    AND {Bos311_where_clause}
+                    {date_clause}
+            ) AS selected_rows
+            GROUP BY GROUPING SETS ((category, type), (category))
+        ) AS summary
+        ORDER BY category, is_total, total DESC
+        """
+        return query, tuple(month_range)
+    elif data_request == "311_timeseries":
+        date_clause = "AND open_dt >= ? AND open_dt < ?" if month_range else ""
+        query = f"""
+        SELECT
+            strftime(date_trunc('{bucket or "month"}', open_dt), '%Y-%m-%d') AS bucket,
+            normalized_type AS category,
+            COUNT(*) AS total
+        FROM bos311_data
+        WHERE
+            {SQLConstants.CATEGORY_FILTERS[request_options or 'all']}
+            AND {Bos311_where_clause}
+            {date_clause}
+        GROUP BY bucket, category
+        ORDER BY bucket, category
+        """
+        return query, tuple(month_range)
+    elif data_request == "911_timeseries":
+        shots_date_clause = (
+            "AND incident_date_time >= ? AND incident_date_time < ?" if month_range else ""
+        )
+        homicides_date_clause = (
+            "AND homicide_date >= ? AND homicide_date < ?" if month_range else ""
+        )
+        query = f"""
+        SELECT * FROM (
+            SELECT
+                strftime(date_trunc('{bucket or "month"}', incident_date_time), '%Y-%m-%d') AS bucket,
+                CASE
+                    WHEN ballistics_evidence = 1 THEN 'Shots Fired Confirmed'
+                    ELSE 'Shots Fired Unconfirmed'
+                END AS category,
+                COUNT(*) AS total
+            FROM shots_fired_data
+            WHERE {Bos911_where_clause}
+                AND ballistics_evidence IN (0, 1)
+                {shots_date_clause}
+            GROUP BY bucket, category
+            UNION ALL
+            SELECT
+                strftime(date_trunc('{bucket or "month"}', homicide_date), '%Y-%m-%d') AS bucket,
+                'Homicides' AS category,
+                COUNT(*) AS total
+            FROM homicide_data
+            WHERE {SQLConstants.BOS911_BASE_WHERE}
+                {homicides_date_clause}
+            GROUP BY bucket
+        ) AS series
+        ORDER BY bucket, category
+        """
+        return query, tuple(month_range) * 2
+    elif data_request == "311_summary_context":
+        breakdown_columns = ",\n            ".join(
+            f"CAST({column} AS BIGINT) AS {column}" for column in TIME_BREAKDOWN_COLUMNS
+        )
+        query = f"""
+        WITH bos911_totals AS (
+            SELECT
+                year,
+                CASE
+                    WHEN ballistics_evidence = 1 THEN '911 Shot Fired Confirmed - Annual Total'
+                    ELSE '911 Shot Fired Unconfirmed - Annual Total'
+                END AS incident_type,
+                {SQLConstants.BOS911_TIME_BREAKDOWN},
+                'Category' AS level_type,
+                NULL AS category
+            FROM shots_fired_data
+            WHERE {Bos911_where_clause}
+            AND ballistics_evidence IN (0, 1)
+            GROUP BY year, ballistics_evidence
+            UNION ALL
+            SELECT
+                year,
+                '911 Homicides - Annual Total' AS incident_type,
+                {SQLConstants.BOS911_TIME_BREAKDOWN},
+                'Category' AS level_type,
+                NULL AS category
+            FROM homicide_data
+            WHERE {SQLConstants.BOS911_BASE_WHERE}
+            GROUP BY year
+        ),
+        bos311_rollup AS (
+            SELECT
+                YEAR(open_dt) AS summary_year,
+                CASE normalized_type
+                    WHEN 'Trash, Recycling, And Waste' THEN '311 Trash & Dumping Issues'
+                    WHEN 'Living Conditions' THEN '311 Living Condition Issues'
+                    WHEN 'Streets, Sidewalks, And Parks' THEN '311 Streets Issues'
+                    WHEN 'Parking' THEN '311 Parking Issues'
+                END AS summary_category,
+                type AS summary_type,
+                {SQLConstants.BOS311_TIME_BREAKDOWN}
+            FROM bos311_data
+            WHERE {SQLConstants.CATEGORY_FILTERS['all']}
+            AND {Bos311_where_clause}
+            GROUP BY ROLLUP (summary_year, summary_category, summary_type)
+        ),
+        context AS (
+            SELECT
+                year,
+                incident_type,
+                {breakdown_columns},
+                level_type,
+                category
+            FROM bos911_totals
+            UNION ALL
+            SELECT
+                summary_year AS year,
+                CASE
+                    WHEN summary_type IS NULL THEN summary_category || ' - Annual Total'
+                    ELSE summary_type
+                END AS incident_type,
+                {breakdown_columns},
+                CASE WHEN summary_type IS NULL THEN 'Category' ELSE 'Type' END AS level_type,
+                CASE WHEN summary_type IS NULL THEN NULL ELSE summary_category END AS category
+            FROM bos311_rollup
+            WHERE summary_category IS NOT NULL
+        )
+        SELECT * FROM context
+        ORDER BY
+            year,
+            CASE
+                WHEN category = '311 Trash & Dumping Issues' OR incident_type = '311 Trash & Dumping Issues - Annual Total' THEN 1
+                WHEN category = '311 Living Condition Issues' OR incident_type = '311 Living Condition Issues - Annual Total' THEN 2
+                WHEN category = '311 Streets Issues' OR incident_type = '311 Streets Issues - Annual Total' THEN 3
+                WHEN category = '311 Parking Issues' OR incident_type = '311 Parking Issues - Annual Total' THEN 4
+                WHEN incident_type = '911 Shot Fired Confirmed - Annual Total' THEN 5
+                WHEN incident_type = '911 Shot Fired Unconfirmed - Annual Total' THEN 6
+                WHEN incident_type = '911 Homicides - Annual Total' THEN 7
+                ELSE 8
+            END,
+            CASE
+                WHEN level_type = 'Category' THEN 2
+                ELSE 1
+            END,
+            incident_type
+        """
+        return query, ()
+    return None
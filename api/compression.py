@@ -0,0 +1,112 @@
+"""
+compression.py
+
+This module contains the negotiated response compression used by the API.
+Buffered responses are compressed in one go when they are larger than a threshold; streamed responses are compressed
+incrementally, flushing after every chunk so clients still receive each batch of rows as soon as it is produced.
+
+Brotli is used when the `brotli` package is installed and the client accepts it, gzip otherwise.
+
+Usage:
+1. Pick an encoding for the request with `choose_encoding`.
+2. Compress a buffered body with `compress_body`, or wrap a streamed body with `compress_stream`.
+"""
+
+import zlib
+from typing import Generator, Iterable, Optional, Union
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is always available
+    brotli = None
+
+# Mimetypes worth compressing. Parquet is already compressed internally
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/geo+json",
+    "application/x-ndjson",
+    "application/vnd.apache.arrow.stream",
+    "application/vnd.mapbox-vector-tile",
+    "text/csv",
+    "text/plain",
+    "text/html",
+)
+
+# Brotli quality and gzip level, chosen for speed since every response is compressed on the fly
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick the content encoding for a response from the request's Accept-Encoding header.
+
+    Args:
+        accept_encodings: The request's parsed Accept-Encoding header (werkzeug Accept).
+
+    Returns:
+        Optional[str]: "br", "gzip", or None if the client accepts neither.
+    """
+    if brotli is not None and "br" in accept_encodings:
+        return "br"
+    if "gzip" in accept_encodings:
+        return "gzip"
+    return None
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """
+    Compress a complete response body.
+
+    Args:
+        data (bytes): The body.
+        encoding (str): "br" or "gzip".
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(
+    chunks: Iterable[Union[str, bytes]], encoding: str
+) -> Generator[bytes, None, None]:
+    """
+    Compress a streamed response body chunk by chunk.
+    The compressor is flushed after every chunk, so each chunk can be decoded by the client as soon as it arrives.
+    Closing this generator closes the wrapped one.
+
+    Args:
+        chunks (Iterable[Union[str, bytes]]): The streamed body.
+        encoding (str): "br" or "gzip".
+
+    Returns:
+        Generator[bytes, None, None]: The compressed chunks.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress = compressor.process
+        flush = compressor.flush
+        finish = compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
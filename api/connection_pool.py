@@ -0,0 +1,309 @@
+"""
+connection_pool.py
+
+This module contains an instrumented wrapper around mysql.connector's connection pool.
+The connector's pool raises PoolError as soon as every connection is checked out; this wrapper queues callers for a
+free connection instead, up to a bounded number of waiters and a timeout, and reconnects connections that have been
+open for too long. The connector itself pings every connection it hands out and reconnects dead ones.
+
+Key Components:
+- `InstrumentedConnectionPool`: bounded wait queue and recycling of old connections.
+- `ReplicaRouter`: round-robin checkout of read-only connections over read replica pools, skipping failed replicas.
+- `LatencyHistogram`: cumulative latency buckets for checkout and wait times.
+- `InstrumentedConnectionPool.metrics`: pool size, in-use and waiting counts, histograms and error counters.
+"""
+
+import itertools
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Optional
+
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram with cumulative buckets, in the style of a Prometheus histogram."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self._buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self._sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        index = len(self._buckets_ms)
+        for bucket_index, upper_bound in enumerate(self._buckets_ms):
+            if milliseconds <= upper_bound:
+                index = bucket_index
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += milliseconds
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            sum_ms = self._sum_ms
+
+        buckets = {}
+        cumulative = 0
+        for upper_bound, count in zip(list(self._buckets_ms) + ["+Inf"], counts):
+            cumulative += count
+            buckets[str(upper_bound)] = cumulative
+        return {"buckets_ms": buckets, "count": cumulative, "sum_ms": round(sum_ms, 3)}
+
+
+class PooledConnection:
+    """
+    Proxy for a pooled connection that hands its slot back to the InstrumentedConnectionPool when closed.
+    Every other attribute, including the underlying `_cnx`, is forwarded to the pooled connection.
+    """
+
+    def __init__(self, pool: "InstrumentedConnectionPool", conn):
+        self._pool = pool
+        self._pooled_conn = conn
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._pooled_conn, name)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._pooled_conn.close()
+        finally:
+            self._pool._release()
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class InstrumentedConnectionPool:
+    """
+    MySQL connection pool with a bounded wait queue, connection health checks and checkout metrics.
+
+    Args:
+        pool_size (int): Number of connections in the pool (at most 32, the connector's limit).
+        max_waiters (int): Callers allowed to wait for a free connection; more are rejected with PoolError at once.
+        timeout (float): Seconds a caller waits for a free connection before PoolError is raised.
+        recycle_after (float): Connections older than this are reconnected before they are handed out. 0 disables.
+        on_reconnect (Callable, optional): Called with the physical connection after it is recycled, to drop state
+            bound to its old client handle such as prepared statements.
+        **kwargs: Passed to MySQLConnectionPool (database settings, pool_reset_session, ...).
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_waiters: int = 32,
+        timeout: float = 10.0,
+        recycle_after: float = 3600.0,
+        on_reconnect: Optional[Callable] = None,
+        **kwargs,
+    ):
+        self._pool = MySQLConnectionPool(pool_size=pool_size, **kwargs)
+        self.pool_size = pool_size
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self.on_reconnect = on_reconnect
+
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiting = 0
+        self._max_in_use = 0
+        self._counters = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "reconnects": 0,
+        }
+        # Connect time of each physical connection
+        self._connected_at = weakref.WeakKeyDictionary()
+
+        self.checkout_latency = LatencyHistogram()
+        self.wait_time = LatencyHistogram()
+
+    def get_connection(self) -> PooledConnection:
+        """
+        Check out a connection, waiting up to `timeout` seconds for one to be returned.
+
+        Returns:
+            PooledConnection: The connection. Close it to return it to the pool.
+
+        Raises:
+            mysql.connector.errors.PoolError: If the wait queue is full or no connection is free before the timeout.
+            mysql.connector.Error: If a stale connection cannot be reconnected.
+        """
+        started = time.perf_counter()
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self._waiting >= self.max_waiters:
+                    self._counters["rejected"] += 1
+                    raise errors.PoolError(
+                        f"Connection pool wait queue is full ({self.max_waiters} waiting)"
+                    )
+                self._waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            self.wait_time.observe(time.perf_counter() - started)
+            if not acquired:
+                with self._lock:
+                    self._counters["timeouts"] += 1
+                raise errors.PoolError(
+                    f"No connection available within {self.timeout:g} seconds"
+                )
+
+        conn = None
+        try:
+            # The connector pings the connection here and reconnects it if the server closed it
+            conn = self._pool.get_connection()
+            self._recycle_if_old(conn)
+        except Exception:
+            if conn is not None:
+                conn.close()
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._max_in_use = max(self._max_in_use, self._in_use)
+            self._counters["checkouts"] += 1
+        self.checkout_latency.observe(time.perf_counter() - started)
+        return PooledConnection(self, conn)
+
+    def _recycle_if_old(self, conn) -> None:
+        """Reconnect a connection that has been open for longer than recycle_after."""
+        raw_conn = getattr(conn, "_cnx", conn)
+        now = time.monotonic()
+        connected_at = self._connected_at.setdefault(raw_conn, now)
+        if self.recycle_after and now - connected_at > self.recycle_after:
+            raw_conn.reconnect()
+            self._connected_at[raw_conn] = time.monotonic()
+            if self.on_reconnect is not None:
+                self.on_reconnect(raw_conn)
+            with self._lock:
+                self._counters["reconnects"] += 1
+
+    def _release(self) -> None:
+        """Free the slot of a returned connection."""
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def metrics(self) -> Dict:
+        """
+        Get a snapshot of the pool's metrics.
+
+        Returns:
+            Dict: Pool size, in-use, peak in-use and waiting counts, error counters, and checkout latency and wait
+            time histograms.
+        """
+        with self._lock:
+            snapshot = {
+                "pool_size": self.pool_size,
+                "in_use": self._in_use,
+                "max_in_use": self._max_in_use,
+                "waiting": self._waiting,
+                "max_waiters": self.max_waiters,
+                **self._counters,
+            }
+        snapshot["checkout_latency"] = self.checkout_latency.snapshot()
+        snapshot["wait_time"] = self.wait_time.snapshot()
+        return snapshot
+
+
+class ReplicaRouter:
+    """
+    Round-robin routing of read-only connections over read replica pools, with failover.
+    Each replica's pool is created on first use. A replica that cannot be connected to is skipped for `retry_after`
+    seconds; a replica whose pool is exhausted is only skipped for that checkout.
+
+    Args:
+        pool_factories (Dict[str, Callable[[], InstrumentedConnectionPool]]): A pool factory per replica name.
+        retry_after (float): Seconds a failed replica is skipped before it is tried again.
+    """
+
+    def __init__(
+        self,
+        pool_factories: Dict[str, Callable[[], InstrumentedConnectionPool]],
+        retry_after: float = 30.0,
+    ):
+        self.retry_after = retry_after
+        self._pool_factories = pool_factories
+        self._pools: Dict[str, InstrumentedConnectionPool] = {}
+        self._down_until = {name: 0.0 for name in pool_factories}
+        self._failovers = 0
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def _get_pool(self, name: str) -> InstrumentedConnectionPool:
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = self._pool_factories[name]()
+                self._pools[name] = pool
+            return pool
+
+    def get_connection(self) -> Optional[PooledConnection]:
+        """
+        Check out a connection from the next healthy replica.
+
+        Returns:
+            Optional[PooledConnection]: The connection, or None if no replica could provide one.
+        """
+        names = list(self._pool_factories)
+        start = next(self._next)
+        for offset in range(len(names)):
+            name = names[(start + offset) % len(names)]
+            if self._down_until[name] > time.monotonic():
+                continue
+            try:
+                return self._get_pool(name).get_connection()
+            except errors.PoolError:
+                pass
+            except errors.Error:
+                with self._lock:
+                    self._down_until[name] = time.monotonic() + self.retry_after
+            with self._lock:
+                self._failovers += 1
+        return None
+
+    def metrics(self) -> Dict:
+        """
+        Get a snapshot of every replica's pool metrics and health.
+
+        Returns:
+            Dict: Per replica name, the pool metrics (once its pool exists) and whether it is being skipped,
+            plus the number of checkouts that failed over to another replica or the primary.
+        """
+        now = time.monotonic()
+        with self._lock:
+            pools = dict(self._pools)
+            down_until = dict(self._down_until)
+            failovers = self._failovers
+
+        replicas = {}
+        for name in self._pool_factories:
+            pool = pools.get(name)
+            replicas[name] = {
+                "down": down_until[name] > now,
+                **(pool.metrics() if pool else {}),
+            }
+        return {"failovers": failovers, "replicas": replicas}
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+data_maintenance.py
+
+This module contains the database maintenance tasks that keep derived tables in sync with the raw 311 and 911 data.
+It is run by auto_data_updater.py after every ingest, and can be run by hand to build the derived tables from scratch.
+It also applies the schema migrations the API queries depend on, such as the indexed spatial point columns.
+
+Usage:
+    python data_maintenance.py          # incremental refresh of all derived tables
+    python data_maintenance.py --full   # rebuild all derived tables from scratch
+"""
+
+import datetime
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from columnar_analytics import write_parquet_snapshots
+from sql_constants import SQLConstants
+
+# Load environment variables
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+}
+
+# Number of trailing months recomputed on an incremental rollup refresh.
+# Late-arriving 311 records are re-aggregated as long as they fall inside this window
+ROLLUP_LOOKBACK_MONTHS = int(os.getenv("BOS311_ROLLUP_LOOKBACK_MONTHS", "3"))
+
+# Earliest month considered on a full rebuild
+ROLLUP_EPOCH = datetime.date(2000, 1, 1)
+
+# Parquet snapshots read by the API's columnar engine, written only when it is enabled
+COLUMNAR_ENGINE_ENABLED = os.getenv("COLUMNAR_ENGINE_ENABLED", "False").lower() == "true"
+COLUMNAR_SNAPSHOT_PATH = Path(__file__).parent / Path(
+    os.getenv("COLUMNAR_SNAPSHOT_PATH", "./snapshots").lstrip("./")
+)
+
+BOS311_ROLLUP_DDL = f"""
+CREATE TABLE IF NOT EXISTS {SQLConstants.BOS311_ROLLUP_TABLE} (
+    month DATE NOT NULL,
+    category VARCHAR(64) NOT NULL,
+    type VARCHAR(255) NOT NULL,
+    police_district VARCHAR(10) NOT NULL DEFAULT '',
+    neighborhood VARCHAR(100) NOT NULL DEFAULT '',
+    in_spatial TINYINT(1) NOT NULL DEFAULT 0,
+    total INT UNSIGNED NOT NULL,
+    PRIMARY KEY (month, category, type, police_district, neighborhood, in_spatial),
+    INDEX idx_month_type (month, type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+# Only rows that can be returned by a 311 summary (base area or TNT polygon, known category) are rolled up
+BOS311_ROLLUP_REFRESH = f"""
+INSERT INTO {SQLConstants.BOS311_ROLLUP_TABLE}
+    (month, category, type, police_district, neighborhood, in_spatial, total)
+SELECT
+    CAST(DATE_FORMAT(open_dt, '%Y-%m-01') AS DATE) AS rollup_month,
+    normalized_type AS rollup_category,
+    type,
+    COALESCE(police_district, '') AS rollup_district,
+    COALESCE(neighborhood, '') AS rollup_neighborhood,
+    COALESCE({SQLConstants.BOS311_SPATIAL_WHERE}, 0) AS rollup_in_spatial,
+    COUNT(*)
+FROM bos311_data
+WHERE
+    open_dt >= %s
+    AND {SQLConstants.CATEGORY_FILTERS['all']}
+    AND (
+        ({SQLConstants.BOS311_BASE_WHERE})
+        OR {SQLConstants.BOS311_SPATIAL_WHERE}
+    )
+GROUP BY
+    rollup_month, rollup_category, type, rollup_district, rollup_neighborhood, rollup_in_spatial
+"""
+
+# Tables that get an indexed point column for the TNT polygon filter
+SPATIAL_TABLES = ("bos311_data", "shots_fired_data")
+
+# Stored generated column, so rows written by any ingest script are indexed without changes to the importers.
+# Rows without coordinates get POINT(0 0), which lies outside the TNT polygon, because a SPATIAL index needs NOT NULL
+SPATIAL_COLUMN_DDL = f"""
+ALTER TABLE {{table}}
+    ADD COLUMN {SQLConstants.SPATIAL_POINT_COLUMN} POINT SRID {SQLConstants.SPATIAL_POINT_SRID}
+        GENERATED ALWAYS AS (
+            ST_SRID(COALESCE(coordinates, POINT(0, 0)), {SQLConstants.SPATIAL_POINT_SRID})
+        ) STORED NOT NULL,
+    ADD SPATIAL INDEX sidx_{SQLConstants.SPATIAL_POINT_COLUMN} ({SQLConstants.SPATIAL_POINT_COLUMN})
+"""
+
+# Stored generated category column, so rows written by any ingest script are categorized without changes to the
+# importers. Requests filter on (normalized_type, open_dt) ranges; (type, open_dt) serves per-type lookups
+CATEGORY_COLUMN_DDL = f"""
+ALTER TABLE bos311_data
+    ADD COLUMN {SQLConstants.CATEGORY_COLUMN} VARCHAR(64)
+        GENERATED ALWAYS AS ({SQLConstants.BOS311_CATEGORY_CASE}) STORED,
+    ADD INDEX idx_{SQLConstants.CATEGORY_COLUMN}_open_dt ({SQLConstants.CATEGORY_COLUMN}, open_dt),
+    ADD INDEX idx_type_open_dt (type, open_dt)
+"""
+
+# Tables served by since= delta queries
+WATERMARK_TABLES = ("bos311_data", "shots_fired_data")
+
+# Maintained by MySQL on every insert and update, so rows written by any ingest script are tracked without changes
+# to the importers. Rows that exist when the column is added get the time of the migration
+WATERMARK_COLUMN_DDL = f"""
+ALTER TABLE {{table}}
+    ADD COLUMN {SQLConstants.ROW_UPDATED_COLUMN} TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_{SQLConstants.ROW_UPDATED_COLUMN} ({SQLConstants.ROW_UPDATED_COLUMN})
+"""
+
+# Same-day join of confirmed shots fired to Dorchester homicides, evaluated once per ingest instead of per request.
+# Source column types are kept, so the API returns the same values it did from the live join
+HOMICIDE_SHOTS_LINK_SELECT = """
+SELECT
+    s.id AS shot_id,
+    h.homicide_date AS homicide_date,
+    s.latitude AS latitude,
+    s.longitude AS longitude
+FROM
+    shots_fired_data s
+INNER JOIN
+    homicide_data h
+ON
+    DATE(s.incident_date_time) = DATE(h.homicide_date)
+    AND s.district = h.district
+WHERE
+    s.ballistics_evidence = 1
+    AND h.district IN ('B3', 'C11', 'B2')
+    AND h.neighborhood = 'Dorchester'
+    AND s.year >= 2018
+    AND s.year < 2025
+"""
+
+DATA_VERSION_DDL = f"""
+CREATE TABLE IF NOT EXISTS {SQLConstants.DATA_VERSION_TABLE} (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+
+def get_connection():
+    """Open a dedicated connection for maintenance work, outside of the API connection pool"""
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def _subtract_months(month: datetime.date, months: int) -> datetime.date:
+    """Return the first day of the month that is `months` before `month`"""
+    index = month.year * 12 + (month.month - 1) - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    """Check whether a table in the current database has a column"""
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    (exists,) = cursor.fetchone()
+    return exists > 0
+
+
+def migrate_spatial_columns(conn) -> int:
+    """
+    Add the SRID-tagged point column and SPATIAL index used by the TNT polygon filter to every table that lacks it.
+    Safe to run repeatedly; the ALTER rebuilds the table, so the first run on a large table takes a while.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: The number of tables migrated.
+    """
+    cursor = conn.cursor()
+    migrated = 0
+    try:
+        for table in SPATIAL_TABLES:
+            if _column_exists(cursor, table, SQLConstants.SPATIAL_POINT_COLUMN):
+                continue
+
+            cursor.execute(SPATIAL_COLUMN_DDL.format(table=table))
+            migrated += 1
+            logging.info(
+                f"✅ Added {SQLConstants.SPATIAL_POINT_COLUMN} and its SPATIAL index to {table}"
+            )
+        return migrated
+    finally:
+        cursor.close()
+
+
+def migrate_watermark_columns(conn) -> int:
+    """
+    Add the indexed row update timestamp used by since= delta queries to every table that lacks it.
+    Safe to run repeatedly.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: The number of tables migrated.
+    """
+    cursor = conn.cursor()
+    migrated = 0
+    try:
+        for table in WATERMARK_TABLES:
+            if _column_exists(cursor, table, SQLConstants.ROW_UPDATED_COLUMN):
+                continue
+
+            cursor.execute(WATERMARK_COLUMN_DDL.format(table=table))
+            migrated += 1
+            logging.info(f"✅ Added {SQLConstants.ROW_UPDATED_COLUMN} and its index to {table}")
+        return migrated
+    finally:
+        cursor.close()
+
+
+def migrate_category_column(conn) -> int:
+    """
+    Add the stored normalized_type column and its composite indexes to bos311_data if it lacks them.
+    Safe to run repeatedly; the ALTER rebuilds the table, so the first run takes a while.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: 1 if the table was migrated, 0 if it already had the column.
+    """
+    cursor = conn.cursor()
+    try:
+        if _column_exists(cursor, "bos311_data", SQLConstants.CATEGORY_COLUMN):
+            return 0
+
+        cursor.execute(CATEGORY_COLUMN_DDL)
+        logging.info(f"✅ Added {SQLConstants.CATEGORY_COLUMN} and its indexes to bos311_data")
+        return 1
+    finally:
+        cursor.close()
+
+
+def refresh_311_rollup(conn, since_month: Optional[datetime.date] = None) -> int:
+    """
+    Refresh the monthly 311 rollup table from bos311_data.
+
+    Months from `since_month` onwards are deleted and re-aggregated in one transaction, so readers never see a
+    partially refreshed month. When `since_month` is not given, the last ROLLUP_LOOKBACK_MONTHS months already in the
+    rollup are refreshed, or the whole table is built if it is empty.
+
+    Args:
+        conn: An open MySQL connection.
+        since_month (datetime.date, optional): First month to recompute.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(BOS311_ROLLUP_DDL)
+
+        if since_month is None:
+            cursor.execute(f"SELECT MAX(month) FROM {SQLConstants.BOS311_ROLLUP_TABLE}")
+            (latest_month,) = cursor.fetchone()
+            if latest_month is None:
+                since_month = ROLLUP_EPOCH
+            else:
+                since_month = _subtract_months(latest_month, ROLLUP_LOOKBACK_MONTHS)
+        since_month = since_month.replace(day=1)
+
+        # Autocommit is off, so the DELETE and INSERT share one transaction until the commit below
+        cursor.execute(
+            f"DELETE FROM {SQLConstants.BOS311_ROLLUP_TABLE} WHERE month >= %s",
+            (since_month,),
+        )
+        cursor.execute(BOS311_ROLLUP_REFRESH, (since_month,))
+        rows_written = cursor.rowcount
+        conn.commit()
+
+        logging.info(
+            f"✅ Refreshed {SQLConstants.BOS311_ROLLUP_TABLE} from {since_month:%Y-%m} ({rows_written} rows)"
+        )
+        return rows_written
+
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def refresh_homicide_shots_link(conn) -> int:
+    """
+    Rebuild the homicide/shots fired link table read by the 911_homicides_and_shots_fired request.
+
+    The new table is built under a temporary name and swapped in with one atomic RENAME, so readers see either
+    the old or the new links, never an empty table.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: The number of links written.
+    """
+    table = SQLConstants.BOS911_HOMICIDE_SHOTS_TABLE
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_new, {table}_old")
+        cursor.execute(
+            f"""
+            CREATE TABLE {table}_new (
+                link_id INT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                INDEX idx_shot_id (shot_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            {HOMICIDE_SHOTS_LINK_SELECT}
+            """
+        )
+        rows_written = cursor.rowcount
+
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """,
+            (table,),
+        )
+        (exists,) = cursor.fetchone()
+        if exists:
+            cursor.execute(
+                f"RENAME TABLE {table} TO {table}_old, {table}_new TO {table}"
+            )
+            cursor.execute(f"DROP TABLE {table}_old")
+        else:
+            cursor.execute(f"RENAME TABLE {table}_new TO {table}")
+
+        logging.info(f"✅ Rebuilt {table} ({rows_written} rows)")
+        return rows_written
+    finally:
+        cursor.close()
+
+
+def refresh_parquet_snapshots(conn) -> int:
+    """
+    Export the raw 311 and 911 tables to the Parquet snapshots read by the API's columnar engine.
+    Run before the data version is bumped, so responses cached for the new version are computed from the new
+    snapshots.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: The number of rows written across all snapshots.
+    """
+    rows_written = write_parquet_snapshots(conn, COLUMNAR_SNAPSHOT_PATH)
+    for table, count in rows_written.items():
+        logging.info(f"✅ Wrote {table} snapshot ({count} rows)")
+    return sum(rows_written.values())
+
+
+def bump_data_version(conn) -> int:
+    """
+    Increment the data version read by the API, invalidating every cached tile and response.
+    Run last, after all derived tables are refreshed. Its updated_at is the watermark of since= delta queries, so
+    every row written by the ingest is older than it.
+
+    Args:
+        conn: An open MySQL connection.
+
+    Returns:
+        int: The new data version.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(DATA_VERSION_DDL)
+        cursor.execute(
+            f"""
+            INSERT INTO {SQLConstants.DATA_VERSION_TABLE} (name, version) VALUES ('all', 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+            """
+        )
+        cursor.execute(
+            f"SELECT version FROM {SQLConstants.DATA_VERSION_TABLE} WHERE name = 'all'"
+        )
+        (version,) = cursor.fetchone()
+        conn.commit()
+
+        logging.info(f"✅ Data version bumped to {version}")
+        return version
+    finally:
+        cursor.close()
+
+
+def run_post_ingest_maintenance(full_rebuild: bool = False) -> bool:
+    """
+    Run every derived-table refresh after an ingest.
+
+    Args:
+        full_rebuild (bool, optional): Rebuild derived tables from scratch instead of refreshing incrementally.
+
+    Returns:
+        bool: True if all tasks succeeded, False otherwise.
+    """
+    try:
+        conn = get_connection()
+    except mysql.connector.Error as e:
+        logging.error(f"❌ Error connecting for data maintenance: {e}")
+        return False
+
+    tasks = [
+        ("spatial columns", lambda: migrate_spatial_columns(conn)),
+        ("watermark columns", lambda: migrate_watermark_columns(conn)),
+        ("category column", lambda: migrate_category_column(conn)),
+        ("311 rollup", lambda: refresh_311_rollup(conn, ROLLUP_EPOCH if full_rebuild else None)),
+        ("homicide link", lambda: refresh_homicide_shots_link(conn)),
+    ]
+    if COLUMNAR_ENGINE_ENABLED:
+        tasks.append(("parquet snapshots", lambda: refresh_parquet_snapshots(conn)))
+    tasks.append(("data version", lambda: bump_data_version(conn)))
+
+    success = True
+    try:
+        for task_name, task in tasks:
+            try:
+                task()
+            except (mysql.connector.Error, OSError) as e:
+                logging.error(f"❌ Error refreshing {task_name}: {e}")
+                success = False
+    finally:
+        conn.close()
+
+    return success
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    success = run_post_ingest_maintenance(full_rebuild="--full" in sys.argv[1:])
+    sys.exit(0 if success else 1)
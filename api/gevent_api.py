@@ -0,0 +1,26 @@
+"""
+gevent_api.py
+
+This module is the entry point for serving api.py in async mode on gevent.
+Sockets, locks and sleeps are patched to cooperate with gevent before the app is imported, so a request waiting on
+Gemini or MySQL yields its worker to other requests instead of pinning a thread. Thousands of idle-waiting requests
+can then share a few worker processes, with the same routes and code as the threaded server.
+
+The MySQL C extension does blocking I/O that gevent cannot switch out of, so the pure Python driver is selected
+unless DB_USE_PURE is set explicitly.
+
+Usage:
+    gunicorn --worker-class gevent --worker-connections 1000 --bind=<hostname>:<port> gevent_api:app
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+os.environ.setdefault("DB_USE_PURE", "True")
+
+from api import app  # noqa: E402
+
+__all__ = ["app"]
@@ -0,0 +1,106 @@
+"""
+json_provider.py
+
+This module contains the Flask JSON provider used by the API, serializing with orjson when it is installed.
+Output matches Flask's default provider (dates as HTTP dates, Decimals and UUIDs as strings, sorted keys), except that
+non-ASCII characters are written as UTF-8 instead of \\u escapes.
+orjson serializes lists, dicts, strings and numbers natively, leaving only dates and Decimals to Python.
+
+Usage:
+1. Install the provider with `app.json = FastJSONProvider(app)`; jsonify and request.get_json use it from then on.
+2. Serialize tuple rows from a cursor with `app.json.dumps_rows`, without converting them to dicts first.
+"""
+
+import operator
+from typing import Any, List, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to Flask's default provider
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, falling back to Flask's default provider when orjson is not installed or
+    cannot encode a value (such as an integer wider than 64 bits).
+    """
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        # Dates and dataclasses go through Flask's default() so they are encoded exactly as Flask would
+        option = (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_NON_STR_KEYS
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _pretty(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        """
+        Serialize data as UTF-8 JSON bytes.
+
+        Args:
+            obj (Any): The data to serialize.
+            indent (bool, optional): Indent the output by 2 spaces.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except orjson.JSONEncodeError:
+                pass
+        if indent:
+            return super().dumps(obj, indent=2).encode("utf-8")
+        return super().dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=self._pretty()) + b"\n", mimetype=self.mimetype
+        )
+
+    def dumps_rows(self, column_names: List[str], rows: Sequence[tuple]) -> bytes:
+        """
+        Serialize tuple rows as a JSON array of objects, the same document jsonify produces for dictionary rows.
+        Columns are put in key order once per result set, so each row is only zipped with the sorted names.
+
+        Args:
+            column_names (List[str]): The result set's column names.
+            rows (Sequence[tuple]): Rows as returned by a tuple cursor.
+
+        Returns:
+            bytes: The JSON document, ending with a newline like a jsonify response.
+        """
+        order = list(range(len(column_names)))
+        if self.sort_keys:
+            order.sort(key=column_names.__getitem__)
+        names = [column_names[index] for index in order]
+
+        if len(order) == 1:
+            (index,) = order
+            objects = [{names[0]: row[index]} for row in rows]
+        else:
+            get_values = operator.itemgetter(*order)
+            objects = [dict(zip(names, get_values(row))) for row in rows]
+        return self.dumps_bytes(objects, indent=self._pretty()) + b"\n"
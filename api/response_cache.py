@@ -0,0 +1,213 @@
+"""
+response_cache.py
+
+This module contains the response cache used by the /data/query endpoint.
+Responses are stored under a key derived from the normalized request parameters and the ingest data version, so
+entries never need a TTL: a new ingest bumps the data version and old entries simply stop being requested.
+
+Key Components:
+- `MemoryResponseCache`: in-process LRU bounded by total body size.
+- `DiskResponseCache`: one file per entry in a directory, pruned oldest-first when over its size limit.
+- `cache_streamed_response`: passes a streamed response through to the client and stores it once fully sent.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Generator, Iterator, NamedTuple, Optional, Union
+
+from cachetools import LRUCache
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    mimetype: str
+    headers: Dict[str, str] = {}
+
+
+def build_cache_key(**params) -> str:
+    """
+    Build a cache key (also used as the strong ETag) from normalized request parameters.
+
+    Args:
+        **params: The request parameters and data version. Values must be JSON serializable.
+
+    Returns:
+        str: A hex SHA-256 digest of the parameters.
+    """
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class NullResponseCache:
+    """Cache backend that stores nothing, used when response caching is disabled."""
+
+    max_entry_bytes = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return None
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        pass
+
+
+class MemoryResponseCache:
+    """
+    In-process LRU cache of responses, bounded by the total size of the cached bodies.
+    Each worker process keeps its own cache.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: len(entry.body))
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            self._cache[key] = entry
+
+
+class DiskResponseCache:
+    """
+    On-disk cache of responses, shared by all worker processes on a host.
+    Entries are written atomically and the oldest files are removed when the directory exceeds its size limit.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int, max_entry_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                metadata = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(body, metadata["mimetype"], metadata["headers"])
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_entry_bytes:
+            return
+
+        metadata = json.dumps({"mimetype": entry.mimetype, "headers": entry.headers})
+        temp_path = self.path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(metadata.encode("utf-8") + b"\n")
+                f.write(entry.body)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError as e:
+            print(f"✖ Error writing response cache entry: {e}")
+            return
+
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove the least recently written entries until the cache fits in max_bytes."""
+        try:
+            entries = [(p.stat(), p) for p in self.path.glob("*.bin")]
+        except OSError:
+            return
+
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, entry_path in sorted(entries, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+                total -= stat.st_size
+            except OSError:
+                pass
+
+
+def create_response_cache(
+    backend: str, max_bytes: int, max_entry_bytes: int, path: Union[str, Path] = ""
+):
+    """
+    Create the response cache backend named in the configuration.
+
+    Args:
+        backend (str): "memory", "disk" or "none".
+        max_bytes (int): Maximum total size of cached bodies.
+        max_entry_bytes (int): Responses larger than this are not cached.
+        path (Union[str, Path], optional): Directory for the disk backend.
+
+    Returns:
+        The cache backend.
+
+    Raises:
+        ValueError: If the backend is not recognized.
+    """
+    if backend == "memory":
+        return MemoryResponseCache(max_bytes, max_entry_bytes)
+    elif backend == "disk":
+        return DiskResponseCache(path, max_bytes, max_entry_bytes)
+    elif backend == "none":
+        return NullResponseCache()
+    raise ValueError(f"Invalid response cache backend: {backend}")
+
+
+def cache_streamed_response(
+    chunks: Iterator[Union[str, bytes]],
+    cache,
+    key: str,
+    mimetype: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Generator[Union[str, bytes], None, None]:
+    """
+    Pass streamed chunks through unchanged and store the complete body in the cache once it has been fully sent.
+    The body is only stored when the wrapped generator returns True (the query completed without error) and the
+    response stays within the cache's entry size limit; a client disconnect closes the wrapped generator.
+
+    Args:
+        chunks (Iterator[Union[str, bytes]]): The streamed response generator.
+        cache: The response cache backend.
+        key (str): The cache key.
+        mimetype (str): The response mimetype to store.
+        headers (Dict[str, str], optional): Extra response headers to store.
+
+    Returns:
+        Generator[Union[str, bytes], None, None]: The same chunks.
+    """
+    buffered = []
+    size = 0
+    cacheable = True
+    completed = False
+
+    try:
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                completed = bool(stop.value)
+                break
+
+            if cacheable:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                size += len(data)
+                if size > cache.max_entry_bytes:
+                    cacheable = False
+                    buffered = []
+                else:
+                    buffered.append(data)
+            yield chunk
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+    if completed and cacheable:
+        cache.set(key, CachedResponse(b"".join(buffered), mimetype, headers or {}))
@@ -0,0 +1,198 @@
+"""
+sql_constants.py
+
+This module contains the SQL fragments shared by the API query builders and the data maintenance tasks.
+It defines the 311 category mappings, the base and spatial WHERE clauses for 311 and 911 data, and the
+aggregation columns used for monthly and quarterly breakdowns.
+It has no runtime dependencies so it can be imported by ingestion scripts without starting the API.
+"""
+
+
+def _polygon_envelope(coordinates: str) -> str:
+    """Return the bounding rectangle of a WKT ring ("lng lat, lng lat, ...") as a WKT ring."""
+    points = [tuple(map(float, point.split())) for point in coordinates.split(",")]
+    lng_min = min(lng for lng, _ in points)
+    lng_max = max(lng for lng, _ in points)
+    lat_min = min(lat for _, lat in points)
+    lat_max = max(lat for _, lat in points)
+    return (
+        f"{lng_min} {lat_min}, {lng_min} {lat_max}, {lng_max} {lat_max}, "
+        f"{lng_max} {lat_min}, {lng_min} {lat_min}"
+    )
+
+
+class SQLConstants:
+    # TNT neighborhood coordinates. Using less specific rectangular shape for now.
+    # Format: "lng_bottom_left lat_bottom_left, lng_top_left lat_top_left, lng_top_right lat_top_right, lng_bottom_right lat_bottom_right, lng_bottom_left lat_bottom_left"
+    DEFAULT_POLYGON_COORDINATES = "-71.081297 42.284182, -71.081784 42.293107, -71.071730 42.293255, -71.071601 42.284301, -71.081297 42.284182"
+
+    # Bounding rectangle of the TNT polygon, used for the spatial index prefilter
+    DEFAULT_POLYGON_ENVELOPE = _polygon_envelope(DEFAULT_POLYGON_COORDINATES)
+
+    # Indexed point column added to bos311_data and shots_fired_data by data_maintenance.migrate_spatial_columns.
+    # Planar longitude/latitude like the TNT polygon; the explicit SRID lets the optimizer use the SPATIAL index
+    SPATIAL_POINT_COLUMN = "geo_point"
+    SPATIAL_POINT_SRID = 0
+
+    # TNT containment test: an MBRContains range scan on the SPATIAL index, then the exact polygon test
+    TNT_SPATIAL_FILTER = f"""
+    MBRContains(
+        ST_GeomFromText('POLYGON(({DEFAULT_POLYGON_ENVELOPE}))', {SPATIAL_POINT_SRID}),
+        {SPATIAL_POINT_COLUMN}
+    )
+    AND ST_Contains(
+        ST_GeomFromText('POLYGON(({DEFAULT_POLYGON_COORDINATES}))', {SPATIAL_POINT_SRID}),
+        {SPATIAL_POINT_COLUMN}
+    )
+    """
+
+    # 311 category mappings
+    CATEGORY_TYPES = {
+        "living_conditions": "'Poor Conditions of Property', 'Needle Pickup', 'Unsatisfactory Living Conditions', 'Rodent Activity', 'Unsafe Dangerous Conditions', 'Pest Infestation - Residential'",
+        "trash": "'Missed Trash/Recycling/Yard Waste/Bulk Item', 'Illegal Dumping'",
+        "streets": "'Requests for Street Cleaning', 'Request for Pothole Repair', 'Unshoveled Sidewalk', 'Tree Maintenance Requests', 'Sidewalk Repair (Make Safe)', 'Street Light Outages', 'Sign Repair'",
+        "parking": "'Parking Enforcement', 'Space Savers', 'Parking on Front/Back Yards (Illegal Parking)', 'Municipal Parking Lot Complaints', 'Private Parking Lot Complaints'",
+    }
+
+    # Set the 'all' category to include all individual categories
+    CATEGORY_TYPES["all"] = ", ".join(
+        [cat for cat in ", ".join(CATEGORY_TYPES.values()).split(", ")]
+    )
+
+    # Maps a 311 type to its normalized category, used when the category is computed in a GROUP BY
+    BOS311_CATEGORY_CASE = f"""
+    CASE
+        WHEN type IN ({CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
+        WHEN type IN ({CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
+        WHEN type IN ({CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
+        WHEN type IN ({CATEGORY_TYPES['parking']}) THEN 'Parking'
+    END
+    """
+
+    # Stored generated column holding BOS311_CATEGORY_CASE, added to bos311_data by
+    # data_maintenance.migrate_category_column with (normalized_type, open_dt) and (type, open_dt) indexes
+    CATEGORY_COLUMN = "normalized_type"
+
+    # Category filters on the stored column, index ranges instead of matching each row against a type IN list
+    CATEGORY_FILTERS = {
+        "living_conditions": "normalized_type = 'Living Conditions'",
+        "trash": "normalized_type = 'Trash, Recycling, And Waste'",
+        "streets": "normalized_type = 'Streets, Sidewalks, And Parks'",
+        "parking": "normalized_type = 'Parking'",
+        "all": "normalized_type IS NOT NULL",
+    }
+
+    BOS311_NORMALIZED_TYPE_CASE = f"""
+    CASE
+        WHEN type IN ({CATEGORY_TYPES['living_conditions']}) THEN 'Living Conditions'
+        WHEN type IN ({CATEGORY_TYPES['trash']}) THEN 'Trash, Recycling, And Waste'
+        WHEN type IN ({CATEGORY_TYPES['streets']}) THEN 'Streets, Sidewalks, And Parks'
+        WHEN type IN ({CATEGORY_TYPES['parking']}) THEN 'Parking'
+    END AS normalized_type,
+    """
+    # Common aggregation columns for monthly/quarterly breakdowns
+    BOS911_TIME_BREAKDOWN = """
+    COUNT(*) AS total_by_year,
+    SUM(CASE WHEN quarter = 1 THEN 1 ELSE 0 END) AS q1_total,
+    SUM(CASE WHEN quarter = 2 THEN 1 ELSE 0 END) AS q2_total,
+    SUM(CASE WHEN quarter = 3 THEN 1 ELSE 0 END) AS q3_total,
+    SUM(CASE WHEN quarter = 4 THEN 1 ELSE 0 END) AS q4_total,
+    SUM(CASE WHEN month = 1 THEN 1 ELSE 0 END) AS jan_total,
+    SUM(CASE WHEN month = 2 THEN 1 ELSE 0 END) AS feb_total,
+    SUM(CASE WHEN month = 3 THEN 1 ELSE 0 END) AS mar_total,
+    SUM(CASE WHEN month = 4 THEN 1 ELSE 0 END) AS apr_total,
+    SUM(CASE WHEN month = 5 THEN 1 ELSE 0 END) AS may_total,
+    SUM(CASE WHEN month = 6 THEN 1 ELSE 0 END) AS jun_total,
+    SUM(CASE WHEN month = 7 THEN 1 ELSE 0 END) AS jul_total,
+    SUM(CASE WHEN month = 8 THEN 1 ELSE 0 END) AS aug_total,
+    SUM(CASE WHEN month = 9 THEN 1 ELSE 0 END) AS sep_total,
+    SUM(CASE WHEN month = 10 THEN 1 ELSE 0 END) AS oct_total,
+    SUM(CASE WHEN month = 11 THEN 1 ELSE 0 END) AS nov_total,
+    SUM(CASE WHEN month = 12 THEN 1 ELSE 0 END) AS dec_total
+    """
+
+    BOS311_TIME_BREAKDOWN = """
+    COUNT(*) AS total_by_year,
+    SUM(CASE WHEN QUARTER(open_dt) = 1 THEN 1 ELSE 0 END) AS q1_total,
+    SUM(CASE WHEN QUARTER(open_dt) = 2 THEN 1 ELSE 0 END) AS q2_total,
+    SUM(CASE WHEN QUARTER(open_dt) = 3 THEN 1 ELSE 0 END) AS q3_total,
+    SUM(CASE WHEN QUARTER(open_dt) = 4 THEN 1 ELSE 0 END) AS q4_total,
+    SUM(CASE WHEN MONTH(open_dt) = 1 THEN 1 ELSE 0 END) AS jan_total,
+    SUM(CASE WHEN MONTH(open_dt) = 2 THEN 1 ELSE 0 END) AS feb_total,
+    SUM(CASE WHEN MONTH(open_dt) = 3 THEN 1 ELSE 0 END) AS mar_total,
+    SUM(CASE WHEN MONTH(open_dt) = 4 THEN 1 ELSE 0 END) AS apr_total,
+    SUM(CASE WHEN MONTH(open_dt) = 5 THEN 1 ELSE 0 END) AS may_total,
+    SUM(CASE WHEN MONTH(open_dt) = 6 THEN 1 ELSE 0 END) AS jun_total,
+    SUM(CASE WHEN MONTH(open_dt) = 7 THEN 1 ELSE 0 END) AS jul_total,
+    SUM(CASE WHEN MONTH(open_dt) = 8 THEN 1 ELSE 0 END) AS aug_total,
+    SUM(CASE WHEN MONTH(open_dt) = 9 THEN 1 ELSE 0 END) AS sep_total,
+    SUM(CASE WHEN MONTH(open_dt) = 10 THEN 1 ELSE 0 END) AS oct_total,
+    SUM(CASE WHEN MONTH(open_dt) = 11 THEN 1 ELSE 0 END) AS nov_total,
+    SUM(CASE WHEN MONTH(open_dt) = 12 THEN 1 ELSE 0 END) AS dec_total
+    """
+
+    # First day of the day, week (starting Monday), month or quarter of a datetime column, for time series buckets
+    TIME_BUCKETS = {
+        "day": "DATE({column})",
+        "week": "DATE_SUB(DATE({column}), INTERVAL WEEKDAY({column}) DAY)",
+        "month": "DATE_SUB(DATE({column}), INTERVAL DAYOFMONTH({column}) - 1 DAY)",
+        "quarter": "MAKEDATE(YEAR({column}), 1) + INTERVAL QUARTER({column}) - 1 QUARTER",
+    }
+
+    # Rows whose coordinates can be geohashed, used by the grid aggregations
+    VALID_COORDINATES_WHERE = (
+        "latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180"
+    )
+
+    ##### 311 specific constants #####
+
+    # Base WHERE clause for 311 queries, not using neighborhood coordinates
+    # This is a simplified version that provides backward compatibility
+    BOS311_BASE_WHERE = (
+        "police_district IN ('B2', 'B3', 'C11') AND neighborhood = 'Dorchester'"
+    )
+
+    # Spatial WHERE clause for 311 queries, using neighborhood coordinates
+    # Uses a polygon that covers the TNT area
+    BOS311_SPATIAL_WHERE = f"({TNT_SPATIAL_FILTER})"
+
+    ##### 311 monthly rollup constants #####
+
+    # Pre-aggregated 311 counts by month, category, type, district and TNT membership.
+    # Maintained by data_maintenance.refresh_311_rollup after each ingest
+    BOS311_ROLLUP_TABLE = "bos311_monthly_rollup"
+
+    # Spatial WHERE clause for the rollup table, the polygon test is evaluated once at refresh time.
+    # BOS311_BASE_WHERE can be used on the rollup table as-is
+    BOS311_ROLLUP_SPATIAL_WHERE = "in_spatial = 1"
+
+    ##### 911 homicide link constants #####
+
+    # Confirmed shots fired on the same day and in the same district as a Dorchester homicide.
+    # Rebuilt by data_maintenance.refresh_homicide_shots_link after each ingest
+    BOS911_HOMICIDE_SHOTS_TABLE = "homicide_shots_fired_link"
+
+    ##### Delta query constants #####
+
+    # Indexed timestamp of each row's last insert or update, kept by MySQL itself (see data_maintenance.py).
+    # since= delta queries return rows changed after a watermark
+    ROW_UPDATED_COLUMN = "row_updated_at"
+
+    ##### Data version constants #####
+
+    # Single-row table bumped after every ingest, used to invalidate cached tiles and responses
+    DATA_VERSION_TABLE = "data_version"
+
+    ##### 911 specific constants #####
+
+    # Base WHERE clause for 911 queries, not using neighborhood coordinates
+    # This is a simplified version that provides backward compatibility
+    BOS911_BASE_WHERE = "district IN ('B2', 'B3', 'C11') AND neighborhood = 'Dorchester' AND year >= 2018 AND year < 2025"
+
+    # Spatial WHERE clause for 911 queries, using neighborhood coordinates
+    # Uses a polygon that covers the TNT area
+    BOS911_SPATIAL_WHERE = f"""
+    year >= 2018 AND year < 2025
+    AND {TNT_SPATIAL_FILTER}
+    """
+
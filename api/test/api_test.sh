@@ -156,8 +156,24 @@ test_data_query() {
 		"/data/query?request=911_shots_fired&app_version=${APP_VERSION}&stream=True"
 		"/data/query?request=911_homicides_and_shots_fired&app_version=${APP_VERSION}&stream=True"
 		"/data/query?request=zip_geo&app_version=${APP_VERSION}&zipcode=02121,02115&stream=True"
+		"/data/query?request=zip_geo&app_version=${APP_VERSION}&zipcode=02121,02115&zoom=12"
 		
 		"/data/query?request=311_summary&category=all&stream=True&app_version=${APP_VERSION}&date=2020-07&output_type=csv"
+
+		"/data/query?request=311_by_geo&app_version=${APP_VERSION}&category=all&date=2019-02&output_type=arrow"
+		"/data/query?request=911_shots_fired&app_version=${APP_VERSION}&output_type=parquet"
+
+		"/data/query?request=311_timeseries&app_version=${APP_VERSION}&category=all&bucket=quarter"
+		"/data/query?request=311_timeseries&app_version=${APP_VERSION}&category=trash&date=2019-02&bucket=day&is_spatial=true"
+		"/data/query?request=911_timeseries&app_version=${APP_VERSION}&bucket=week"
+		"/data/query?request=311_grid&app_version=${APP_VERSION}&category=all&date=2019-02&resolution=7"
+		"/data/query?request=911_grid&app_version=${APP_VERSION}&is_spatial=true&resolution=6"
+
+		"/data/query?request=311_by_geo&app_version=${APP_VERSION}&category=all&date=2019-02&limit=500"
+		"/data/query?request=911_shots_fired&app_version=${APP_VERSION}&limit=500&output_type=stream"
+
+		"/data/query?request=311_by_geo&app_version=${APP_VERSION}&category=all&since=2025-01-01T00:00:00"
+		"/data/query?request=911_shots_fired&app_version=${APP_VERSION}&since=2025-01-01T00:00:00"
 	)
 
 	start_time_big=$(perl -MTime::HiRes=time -e 'printf "%.9f", time')
@@ -199,6 +215,32 @@ test_data_query_post() {
 	echo "All data queries completed in ${elapsed} seconds"
 }
 
+test_data_batch() {
+	local data='{
+		"requests": {
+			"summary": {"request": "311_summary", "category": "all", "date": "2024-05"},
+			"shots": {"request": "911_shots_fired"},
+			"homicides": {"request": "911_homicides_and_shots_fired"},
+			"zips": {"request": "zip_geo", "zipcode": "02121,02115", "zoom": "12"}
+		}
+	}'
+
+	make_request "POST" "/data/query/batch?app_version=${APP_VERSION}" "$data" "-o /dev/null -w %{http_code}:%{size_download}"
+	make_request "POST" "/data/query/batch?app_version=${APP_VERSION}&output_type=ndjson" "$data" "| cut -c 1-120"
+}
+
+test_data_tiles() {
+	local ENDPOINTS=(
+		"/data/tiles/15/9913/12128.mvt?request=311_by_geo&category=all&app_version=${APP_VERSION}"
+		"/data/tiles/15/9913/12128.mvt?request=311_by_geo&category=trash&date=2019-02&is_spatial=true&app_version=${APP_VERSION}"
+		"/data/tiles/15/9913/12128.mvt?request=911_shots_fired&app_version=${APP_VERSION}"
+	)
+
+	for endpoint in "${ENDPOINTS[@]}"; do
+		make_request "GET" "$endpoint" "" "-o /dev/null -w %{http_code}:%{size_download}"
+	done
+}
+
 test_data_zip() {
 	local endpoint="/data/query?request=zip_geo&zipcode=02121,02115&stream=True&app_version=${APP_VERSION}"
 	make_request "GET" "$endpoint" "" "| head -n 5"
@@ -240,17 +282,23 @@ case "$1" in
 	"zip")
 		test_data_zip
 		;;
+	"tiles")
+		test_data_tiles
+		;;
 	"data")
 		test_data_query
 		;;
 	"data_post")
 		test_data_query_post
 		;;
+	"batch")
+		test_data_batch
+		;;
 	"all")
 		run_all_tests
 		;;
 	*)
-		echo "Usage: $0 [context_create|context_list|context_clear|context_token|chat|log|zip|data|data_post|all] [optional_context_type]"
+		echo "Usage: $0 [context_create|context_list|context_clear|context_token|chat|log|zip|tiles|data|data_post|batch|all] [optional_context_type]"
 		exit 1
 		;;
 esac
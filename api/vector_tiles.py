@@ -0,0 +1,196 @@
+"""
+vector_tiles.py
+
+This module contains a minimal Mapbox Vector Tile (MVT 2.1) encoder for point layers, along with the Web Mercator
+tile math needed to select and project incident points into a z/x/y tile.
+Only point geometries are supported, which is all the 311 and 911 incident layers need, so no protobuf or
+geometry library is required.
+
+Usage:
+1. Use `tile_bounds` to get the longitude/latitude bounding box to query for a tile.
+2. Encode each layer's points with `encode_point_layer` and join them into a tile with `encode_tile`.
+"""
+
+import datetime
+import math
+import struct
+from typing import Dict, Iterable, List, Tuple
+
+# Tile coordinate resolution used by Mapbox GL and most clients
+DEFAULT_EXTENT = 4096
+
+# Web Mercator is undefined at the poles, latitudes are clamped to this value
+MAX_LATITUDE = 85.0511287798
+
+# Protobuf wire types
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_LENGTH_DELIMITED = 2
+
+# MVT geometry type and command for a single point
+_GEOM_TYPE_POINT = 1
+_MOVE_TO_ONE_POINT = (1 & 0x7) | (1 << 3)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    Get the longitude/latitude bounding box of a Web Mercator tile.
+
+    Args:
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row, counted from the north.
+
+    Returns:
+        Tuple[float, float, float, float]: (min longitude, min latitude, max longitude, max latitude).
+    """
+    n = 2**z
+    lon_min = x / n * 360.0 - 180.0
+    lon_max = (x + 1) / n * 360.0 - 180.0
+    lat_max = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_min = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return lon_min, lat_min, lon_max, lat_max
+
+
+def is_valid_tile(z: int, x: int, y: int, max_zoom: int = 22) -> bool:
+    """Check that z/x/y addresses an existing tile."""
+    return 0 <= z <= max_zoom and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def project_to_tile(
+    lon: float, lat: float, z: int, x: int, y: int, extent: int = DEFAULT_EXTENT
+) -> Tuple[int, int]:
+    """
+    Project a longitude/latitude into integer tile coordinates, with (0, 0) at the top left of the tile.
+
+    Args:
+        lon (float): Longitude in degrees.
+        lat (float): Latitude in degrees.
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row.
+        extent (int, optional): Tile coordinate resolution (default is 4096).
+
+    Returns:
+        Tuple[int, int]: The point's column and row inside the tile.
+    """
+    n = 2**z
+    lat = max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)
+    lat_rad = math.radians(lat)
+    world_x = (lon + 180.0) / 360.0 * n
+    world_y = (1.0 - math.log(math.tan(lat_rad) + 1 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+    return int(round((world_x - x) * extent)), int(round((world_y - y) * extent))
+
+
+def _varint(value: int) -> bytes:
+    """Encode an unsigned integer as a protobuf varint."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    """ZigZag-encode a signed integer."""
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+
+def _length_delimited(field_number: int, payload: bytes) -> bytes:
+    return _key(field_number, _WIRE_LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed(field_number: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field_number, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value) -> bytes:
+    """Encode a property value as an MVT Value message."""
+    if isinstance(value, bool):
+        return _key(7, _WIRE_VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, _WIRE_VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, _WIRE_64BIT) + struct.pack("<d", value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def encode_point_layer(
+    name: str,
+    features: Iterable[Tuple[float, float, Dict]],
+    z: int,
+    x: int,
+    y: int,
+    extent: int = DEFAULT_EXTENT,
+) -> bytes:
+    """
+    Encode point features as one MVT layer.
+    Property keys and values are de-duplicated into the layer's key and value tables; None values are skipped.
+
+    Args:
+        name (str): The layer name.
+        features (Iterable[Tuple[float, float, Dict]]): (longitude, latitude, properties) for each point.
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row.
+        extent (int, optional): Tile coordinate resolution (default is 4096).
+
+    Returns:
+        bytes: The encoded Layer message, ready to pass to encode_tile.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[tuple, int] = {}
+    encoded_features = []
+
+    for lon, lat, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            key_index = keys.setdefault(key, len(keys))
+            value_index = values.setdefault((type(value), value), len(values))
+            tags.extend((key_index, value_index))
+
+        px, py = project_to_tile(lon, lat, z, x, y, extent)
+        feature = (
+            _packed(2, tags)
+            + _key(3, _WIRE_VARINT)
+            + _varint(_GEOM_TYPE_POINT)
+            + _packed(4, (_MOVE_TO_ONE_POINT, _zigzag(px), _zigzag(py)))
+        )
+        encoded_features.append(_length_delimited(2, feature))
+
+    layer = (
+        _key(15, _WIRE_VARINT)
+        + _varint(2)
+        + _length_delimited(1, name.encode("utf-8"))
+        + b"".join(encoded_features)
+        + b"".join(_length_delimited(3, key.encode("utf-8")) for key in keys)
+        + b"".join(_length_delimited(4, _encode_value(value)) for _, value in values)
+        + _key(5, _WIRE_VARINT)
+        + _varint(extent)
+    )
+    return layer
+
+
+def encode_tile(layers: List[bytes]) -> bytes:
+    """
+    Join encoded layers into a Tile message.
+
+    Args:
+        layers (List[bytes]): Layers from encode_point_layer.
+
+    Returns:
+        bytes: The encoded vector tile.
+    """
+    return b"".join(_length_delimited(3, layer) for layer in layers)
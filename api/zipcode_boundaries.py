@@ -0,0 +1,163 @@
+"""
+zipcode_boundaries.py
+
+This module contains the GeoJSON simplification and serialization used to serve zipcode boundaries from memory.
+Boundaries are simplified once per zoom band with the Douglas-Peucker algorithm and serialized to GeoJSON Feature
+bytes, so a request only joins the features it needs and never touches the database.
+Only Polygon and MultiPolygon geometries are simplified, which is all the zipcode_geo table holds, so no geometry
+library is required.
+
+Usage:
+1. Build each zoom band's features with `build_zipcode_features`.
+2. Pick the band for a request with `zoom_band` and join its features with `build_feature_collection`.
+"""
+
+import json
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (highest zoom, tolerance in degrees) for each simplification band, from coarsest to full resolution.
+# About 100 m at city zooms, about 20 m at street zooms, unsimplified above that
+ZOOM_BANDS = ((11, 0.001), (14, 0.0002), (None, 0.0))
+
+# Decimal places kept in coordinates, about 10 cm
+COORDINATE_PRECISION = 6
+
+
+def zoom_band(zoom: Optional[int]) -> int:
+    """
+    Get the index of the simplification band for a map zoom level.
+
+    Args:
+        zoom (Optional[int]): The client's zoom level, or None for full resolution.
+
+    Returns:
+        int: An index into ZOOM_BANDS.
+    """
+    if zoom is None:
+        return len(ZOOM_BANDS) - 1
+    for index, (max_zoom, _) in enumerate(ZOOM_BANDS):
+        if max_zoom is None or zoom <= max_zoom:
+            return index
+    return len(ZOOM_BANDS) - 1
+
+
+def _segment_distance(point: Sequence[float], start: Sequence[float], end: Sequence[float]) -> float:
+    """Distance from a point to the segment between start and end, in coordinate units."""
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(point[0] - (start[0] + t * dx), point[1] - (start[1] + t * dy))
+
+
+def simplify_line(points: List[Sequence[float]], tolerance: float) -> List[Sequence[float]]:
+    """
+    Simplify a line with the Douglas-Peucker algorithm, keeping its first and last points.
+
+    Args:
+        points (List[Sequence[float]]): The line's [x, y] points.
+        tolerance (float): The largest distance a removed point may lie from the simplified line.
+
+    Returns:
+        List[Sequence[float]]: The kept points, in order.
+    """
+    if tolerance <= 0 or len(points) < 3:
+        return points
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance = 0.0
+        max_index = first
+        for index in range(first + 1, last):
+            distance = _segment_distance(points[index], points[first], points[last])
+            if distance > max_distance:
+                max_distance = distance
+                max_index = index
+        if max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_ring(ring: List[Sequence[float]], tolerance: float) -> List[Sequence[float]]:
+    """Simplify a closed polygon ring, keeping the original if it would collapse below a triangle."""
+    simplified = simplify_line(ring, tolerance)
+    return simplified if len(simplified) >= 4 else ring
+
+
+def simplify_geometry(geometry: Dict, tolerance: float) -> Dict:
+    """
+    Simplify a GeoJSON Polygon or MultiPolygon and round its coordinates.
+    Other geometry types are returned unchanged.
+
+    Args:
+        geometry (Dict): A GeoJSON geometry object.
+        tolerance (float): Simplification tolerance in degrees, 0 to only round coordinates.
+
+    Returns:
+        Dict: The simplified geometry.
+    """
+
+    def simplify_polygon(rings):
+        return [
+            [
+                [round(x, COORDINATE_PRECISION), round(y, COORDINATE_PRECISION)]
+                for x, y, *_ in simplify_ring(ring, tolerance)
+            ]
+            for ring in rings
+        ]
+
+    if geometry.get("type") == "Polygon":
+        return {"type": "Polygon", "coordinates": simplify_polygon(geometry["coordinates"])}
+    if geometry.get("type") == "MultiPolygon":
+        return {
+            "type": "MultiPolygon",
+            "coordinates": [simplify_polygon(polygon) for polygon in geometry["coordinates"]],
+        }
+    return geometry
+
+
+def build_zipcode_features(boundaries: Iterable[Tuple[str, str]]) -> List[Dict[str, bytes]]:
+    """
+    Serialize zipcode boundaries as GeoJSON Feature bytes for every zoom band.
+
+    Args:
+        boundaries (Iterable[Tuple[str, str]]): (zipcode, GeoJSON geometry text) pairs.
+
+    Returns:
+        List[Dict[str, bytes]]: One {zipcode: Feature bytes} mapping per entry in ZOOM_BANDS.
+    """
+    bands: List[Dict[str, bytes]] = [{} for _ in ZOOM_BANDS]
+    for zipcode, geometry_text in boundaries:
+        if not geometry_text:
+            continue
+        geometry = json.loads(geometry_text)
+        for band, (_, tolerance) in zip(bands, ZOOM_BANDS):
+            feature = {
+                "type": "Feature",
+                "geometry": simplify_geometry(geometry, tolerance),
+                "properties": {"zipcode": zipcode},
+            }
+            band[zipcode] = json.dumps(feature, separators=(",", ":")).encode("utf-8")
+    return bands
+
+
+def build_feature_collection(features: Iterable[bytes]) -> bytes:
+    """
+    Join serialized Features into a GeoJSON FeatureCollection.
+
+    Args:
+        features (Iterable[bytes]): Feature bytes from build_zipcode_features.
+
+    Returns:
+        bytes: The FeatureCollection document.
+    """
+    return b'{"type":"FeatureCollection","features":[' + b",".join(features) + b"]}"